@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Simplified data generation script with minimal dependencies.
+Simplified data generation script (stdlib + NumPy/pandas only).
 """
 
 import csv
@@ -9,6 +9,9 @@ import random
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 # Configuration
 RANDOM_SEED = 42
 DATA_DIR = Path(__file__).parent.parent / "data"
@@ -17,6 +20,7 @@ NUM_MONTHS = 3
 
 # Set random seed
 random.seed(RANDOM_SEED)
+rng = np.random.default_rng(RANDOM_SEED)
 
 # Ensure data directory exists
 DATA_DIR.mkdir(exist_ok=True)
@@ -42,108 +46,134 @@ CATEGORIES = ["groceries", "dining", "gas", "travel", "entertainment",
 
 STATES = ["CA", "TX", "FL", "NY", "PA", "IL", "OH", "GA", "NC", "MI"]
 
+
+def build_alias_table(weights):
+    """Build a Walker alias table for O(1) weighted sampling."""
+    n = len(weights)
+    prob = np.asarray(weights, dtype=float) * n / sum(weights)
+    alias = np.zeros(n, dtype=int)
+    
+    small = [i for i in range(n) if prob[i] < 1.0]
+    large = [i for i in range(n) if prob[i] >= 1.0]
+    while small and large:
+        lo, hi = small.pop(), large.pop()
+        alias[lo] = hi
+        prob[hi] -= 1.0 - prob[lo]
+        (small if prob[hi] < 1.0 else large).append(hi)
+    
+    # Leftovers are exactly 1.0 up to rounding error
+    for i in small + large:
+        prob[i] = 1.0
+    
+    return prob, alias
+
+
+def sample_alias(prob, alias, size):
+    """Draw `size` indices from an alias table in one batch."""
+    idx = rng.integers(0, len(prob), size)
+    return np.where(rng.random(size) < prob[idx], idx, alias[idx])
+
 print("Generating mock data...")
 
 # Generate users
 print("1. Generating users.csv...")
-with open(DATA_DIR / "users.csv", "w", newline="") as f:
-    writer = csv.DictWriter(f, fieldnames=["user_id", "age", "income", "credit_score", "location", "created_at"])
-    writer.writeheader()
-    
-    users = []
-    for i in range(NUM_USERS):
-        user = {
-            "user_id": f"user_{i+1:05d}",
-            "age": random.randint(18, 80),
-            "income": round(random.uniform(20000, 250000), -3),
-            "credit_score": random.randint(550, 850),
-            "location": random.choice(STATES),
-            "created_at": (datetime.now() - timedelta(days=random.randint(0, 730))).isoformat()
-        }
-        users.append(user)
-        writer.writerow(user)
+users_df = pd.DataFrame({
+    "user_id": [f"user_{i+1:05d}" for i in range(NUM_USERS)],
+    "age": rng.integers(18, 81, NUM_USERS),
+    "income": np.round(rng.uniform(20000, 250000, NUM_USERS), -3),
+    "credit_score": rng.integers(550, 851, NUM_USERS),
+    "location": rng.choice(STATES, NUM_USERS),
+    "created_at": np.datetime64(datetime.now()) - rng.integers(0, 731, NUM_USERS).astype("timedelta64[D]"),
+})
+users_df.to_csv(DATA_DIR / "users.csv", index=False, date_format="%Y-%m-%dT%H:%M:%S.%f")
+users = users_df.to_dict("records")
 
 # Generate card ownership
 print("2. Generating card_ownership.csv...")
-with open(DATA_DIR / "card_ownership.csv", "w", newline="") as f:
-    writer = csv.DictWriter(f, fieldnames=["user_id", "card_id", "ownership_start_date", "is_primary", "credit_limit"])
-    writer.writeheader()
+ownerships = []
+for user in users:
+    # Number of cards based on credit score
+    if user["credit_score"] < 650:
+        num_cards = random.randint(1, 2)
+    elif user["credit_score"] < 750:
+        num_cards = random.randint(2, 4)
+    else:
+        num_cards = random.randint(3, 6)
+    
+    # Select random cards
+    selected_cards = random.sample(CARDS, min(num_cards, len(CARDS)))
     
-    ownerships = []
-    for user in users:
-        # Number of cards based on credit score
-        if user["credit_score"] < 650:
-            num_cards = random.randint(1, 2)
-        elif user["credit_score"] < 750:
-            num_cards = random.randint(2, 4)
-        else:
-            num_cards = random.randint(3, 6)
-        
-        # Select random cards
-        selected_cards = random.sample(CARDS, min(num_cards, len(CARDS)))
-        
-        for idx, card in enumerate(selected_cards):
-            ownership = {
-                "user_id": user["user_id"],
-                "card_id": card["card_id"],
-                "ownership_start_date": (datetime.fromisoformat(user["created_at"]) + 
-                                       timedelta(days=random.randint(0, 365))).isoformat(),
-                "is_primary": idx == 0,
-                "credit_limit": round(user["income"] * random.uniform(0.1, 0.3), -2)
-            }
-            ownerships.append(ownership)
-            writer.writerow(ownership)
+    for idx, card in enumerate(selected_cards):
+        ownership = {
+            "user_id": user["user_id"],
+            "card_id": card["card_id"],
+            "ownership_start_date": (user["created_at"] + 
+                                   timedelta(days=random.randint(0, 365))).isoformat(),
+            "is_primary": idx == 0,
+            "credit_limit": round(user["income"] * random.uniform(0.1, 0.3), -2)
+        }
+        ownerships.append(ownership)
+
+ownership_fields = ["user_id", "card_id", "ownership_start_date", "is_primary", "credit_limit"]
+with open(DATA_DIR / "card_ownership.csv", "w", newline="") as f:
+    writer = csv.writer(f)
+    writer.writerow(ownership_fields)
+    writer.writerows(tuple(o[field] for field in ownership_fields) for o in ownerships)
 
 # Generate transactions
 print("3. Generating transactions.csv...")
-transaction_count = 0
-with open(DATA_DIR / "transactions.csv", "w", newline="") as f:
-    writer = csv.DictWriter(f, fieldnames=["transaction_id", "user_id", "card_id", "amount", 
-                                          "category", "merchant", "location", "timestamp"])
-    writer.writeheader()
+end_date = datetime.now()
+start_date = end_date - timedelta(days=30 * NUM_MONTHS)
+
+# Group ownerships by user
+user_cards = {}
+for ownership in ownerships:
+    user_id = ownership["user_id"]
+    if user_id not in user_cards:
+        user_cards[user_id] = []
+    user_cards[user_id].append(ownership)
+
+# Pick cards for each user's transactions (prefer primary)
+txn_user_ids = []
+txn_card_ids = []
+txn_locations = []
+for user in users:
+    if user["user_id"] not in user_cards:
+        continue
+    
+    cards = user_cards[user["user_id"]]
     
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=30 * NUM_MONTHS)
+    # Generate 10-50 transactions per month per user
+    num_transactions = int(rng.integers(10 * NUM_MONTHS, 50 * NUM_MONTHS + 1))
     
-    # Group ownerships by user
-    user_cards = {}
-    for ownership in ownerships:
-        user_id = ownership["user_id"]
-        if user_id not in user_cards:
-            user_cards[user_id] = []
-        user_cards[user_id].append(ownership)
+    prob, alias = build_alias_table([3 if c["is_primary"] else 1 for c in cards])
+    card_indices = sample_alias(prob, alias, num_transactions)
     
-    # Generate transactions for each user
-    for user in users:
-        if user["user_id"] not in user_cards:
-            continue
-        
-        cards = user_cards[user["user_id"]]
-        
-        # Generate 10-50 transactions per month per user
-        num_transactions = random.randint(10 * NUM_MONTHS, 50 * NUM_MONTHS)
-        
-        for _ in range(num_transactions):
-            # Pick a random card (prefer primary)
-            card = random.choices(cards, 
-                                weights=[3 if c["is_primary"] else 1 for c in cards])[0]
-            
-            # Generate transaction
-            days_ago = random.randint(0, (end_date - start_date).days)
-            transaction = {
-                "transaction_id": f"txn_{transaction_count:08d}",
-                "user_id": user["user_id"],
-                "card_id": card["card_id"],
-                "amount": round(random.uniform(10, 500), 2),
-                "category": random.choice(CATEGORIES),
-                "merchant": f"Merchant_{random.randint(1, 1000)}",
-                "location": user["location"],
-                "timestamp": (end_date - timedelta(days=days_ago, 
-                                                 hours=random.randint(0, 23),
-                                                 minutes=random.randint(0, 59))).isoformat()
-            }
-            writer.writerow(transaction)
-            transaction_count += 1
+    txn_user_ids.append(np.full(num_transactions, user["user_id"]))
+    txn_card_ids.append(np.array([c["card_id"] for c in cards])[card_indices])
+    txn_locations.append(np.full(num_transactions, user["location"]))
+
+# Draw the remaining transaction fields for all users in one batch
+transaction_count = sum(len(ids) for ids in txn_user_ids)
+days_ago = rng.integers(0, (end_date - start_date).days + 1, transaction_count)
+hours_ago = rng.integers(0, 24, transaction_count)
+minutes_ago = rng.integers(0, 60, transaction_count)
+
+transactions_df = pd.DataFrame({
+    "transaction_id": [f"txn_{i:08d}" for i in range(transaction_count)],
+    "user_id": np.concatenate(txn_user_ids),
+    "card_id": np.concatenate(txn_card_ids),
+    "amount": np.round(rng.uniform(10, 500, transaction_count), 2),
+    "category": rng.choice(CATEGORIES, transaction_count),
+    "merchant": np.char.add("Merchant_", rng.integers(1, 1001, transaction_count).astype(str)),
+    "location": np.concatenate(txn_locations),
+    # Pre-formatted in C; to_csv's strftime-based date_format is far slower
+    "timestamp": np.datetime_as_string(np.datetime64(end_date)
+                                       - days_ago.astype("timedelta64[D]")
+                                       - hours_ago.astype("timedelta64[h]")
+                                       - minutes_ago.astype("timedelta64[m]"), unit="us"),
+})
+transactions_df.to_csv(DATA_DIR / "transactions.csv", index=False, chunksize=50000)
 
 print(f"\n✅ Data generation complete!")
 print(f"- Users: {NUM_USERS:,}")
@@ -4,22 +4,25 @@ Materialize features for the RecEngine feature store.
 """
 
 import argparse
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 
 FEATURES_DIR = Path(__file__).parent.parent / "features"
 
 
 def materialize_features(start_date: str = None, end_date: str = None, dry_run: bool = False):
-    """Materialize features to online store."""
+    """Materialize features to online store.
     
-    if not start_date:
-        end_dt = datetime.now()
-        start_dt = end_dt - timedelta(days=7)
-        start_date = start_dt.strftime("%Y-%m-%d")
-        end_date = end_dt.strftime("%Y-%m-%d")
+    Without an explicit start date, Feast materializes incrementally from
+    each feature view's last materialized timestamp (tracked in its registry).
+    """
+    end_dt = datetime.fromisoformat(end_date) if end_date else datetime.now()
+    start_dt = datetime.fromisoformat(start_date) if start_date else None
     
-    print(f"Materializing features from {start_date} to {end_date}")
+    if start_dt:
+        print(f"Materializing features from {start_dt.isoformat()} to {end_dt.isoformat()}")
+    else:
+        print(f"Materializing features incrementally up to {end_dt.isoformat()}")
     
     if dry_run:
         print("DRY RUN: Would materialize features but not actually doing it")
@@ -34,7 +37,10 @@ def materialize_features(start_date: str = None, end_date: str = None, dry_run:
         fs = get_feature_store()
         
         # Materialize features
-        fs.materialize(start_date=start_date, end_date=end_date)
+        if start_dt:
+            fs.materialize(start_date=start_dt, end_date=end_dt)
+        else:
+            fs.materialize_incremental(end_date=end_dt)
         
         print("✅ Feature materialization completed successfully!")
         return True
@@ -45,7 +51,8 @@ def materialize_features(start_date: str = None, end_date: str = None, dry_run:
         # Create materialization marker
         marker_file = FEATURES_DIR / "materialized.marker"
         with open(marker_file, "w") as f:
-            f.write(f"Mock materialization: {start_date} to {end_date}\n")
+            start = start_dt.isoformat() if start_dt else "last materialization"
+            f.write(f"Mock materialization: {start} to {end_dt.isoformat()}\n")
             f.write(f"Timestamp: {datetime.now().isoformat()}\n")
         
         print("✅ Mock materialization completed!")
@@ -98,7 +105,7 @@ def check_materialization_status():
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description="Materialize RecEngine features")
-    parser.add_argument("--start-date", help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--start-date", help="Start date (YYYY-MM-DD, default: incremental from last materialization)")
     parser.add_argument("--end-date", help="End date (YYYY-MM-DD)")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be done")
     parser.add_argument("--status", action="store_true", help="Check materialization status")
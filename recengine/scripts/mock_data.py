@@ -5,8 +5,6 @@ Creates users.csv, card_ownership.csv, and transactions.csv
 """
 
 import argparse
-import random
-import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Tuple
@@ -134,49 +132,47 @@ US_STATES = [
 ]
 
 
-def generate_users(num_users: int) -> pd.DataFrame:
+def generate_users(num_users: int, rng: np.random.Generator = None) -> pd.DataFrame:
     """Generate user profiles."""
-    random.seed(RANDOM_SEED)
-    np.random.seed(RANDOM_SEED)
+    if rng is None:
+        rng = np.random.default_rng(RANDOM_SEED)
     
-    users = []
-    for i in range(num_users):
-        user = {
-            "user_id": f"user_{i+1:05d}",
-            "age": random.randint(*AGE_RANGE),
-            "income": round(random.uniform(*INCOME_RANGE), -3),  # Round to nearest 1000
-            "credit_score": random.randint(*CREDIT_SCORE_RANGE),
-            "location": random.choice(US_STATES),
-            "created_at": datetime.now() - timedelta(days=random.randint(0, 730)),
-        }
-        
-        # Add user preferences based on demographics
-        if user["age"] < 30:
-            user["preferred_categories"] = ["dining", "entertainment", "online_shopping"]
-        elif user["age"] < 50:
-            user["preferred_categories"] = ["groceries", "gas", "dining"]
-        else:
-            user["preferred_categories"] = ["groceries", "healthcare", "utilities"]
-        
-        users.append(user)
+    ages = rng.integers(AGE_RANGE[0], AGE_RANGE[1] + 1, num_users)
+    
+    # Add user preferences based on demographics
+    preferred_categories = [
+        ["dining", "entertainment", "online_shopping"] if age < 30
+        else ["groceries", "gas", "dining"] if age < 50
+        else ["groceries", "healthcare", "utilities"]
+        for age in ages
+    ]
     
-    return pd.DataFrame(users)
+    return pd.DataFrame({
+        "user_id": [f"user_{i+1:05d}" for i in range(num_users)],
+        "age": ages,
+        "income": np.round(rng.uniform(*INCOME_RANGE, num_users), -3),  # Round to nearest 1000
+        "credit_score": rng.integers(CREDIT_SCORE_RANGE[0], CREDIT_SCORE_RANGE[1] + 1, num_users),
+        "location": rng.choice(US_STATES, num_users),
+        "created_at": pd.Timestamp.now() - pd.to_timedelta(rng.integers(0, 731, num_users), unit="D"),
+        "preferred_categories": preferred_categories,
+    })
 
 
-def generate_card_ownership(users_df: pd.DataFrame) -> pd.DataFrame:
+def generate_card_ownership(users_df: pd.DataFrame, rng: np.random.Generator = None) -> pd.DataFrame:
     """Generate card ownership data."""
-    random.seed(RANDOM_SEED)
+    if rng is None:
+        rng = np.random.default_rng(RANDOM_SEED)
     
     ownerships = []
     
     for _, user in users_df.iterrows():
         # Determine number of cards based on credit score
         if user["credit_score"] < 650:
-            num_cards = random.randint(1, 2)
+            num_cards = rng.integers(1, 3)
         elif user["credit_score"] < 750:
-            num_cards = random.randint(2, 4)
+            num_cards = rng.integers(2, 5)
         else:
-            num_cards = random.randint(3, 6)
+            num_cards = rng.integers(3, 7)
         
         # Select cards based on user profile
         available_cards = CARD_CATALOG.copy()
@@ -187,15 +183,16 @@ def generate_card_ownership(users_df: pd.DataFrame) -> pd.DataFrame:
             available_cards = sorted(available_cards, key=lambda x: x["annual_fee"])
         
         # Select cards
-        selected_cards = random.sample(available_cards, min(num_cards, len(available_cards)))
+        selected_idx = rng.choice(len(available_cards), min(num_cards, len(available_cards)), replace=False)
+        selected_cards = [available_cards[i] for i in selected_idx]
         
         for idx, card in enumerate(selected_cards):
             ownership = {
                 "user_id": user["user_id"],
                 "card_id": card["card_id"],
-                "ownership_start_date": user["created_at"] + timedelta(days=random.randint(0, 365)),
+                "ownership_start_date": user["created_at"] + timedelta(days=int(rng.integers(0, 366))),
                 "is_primary": idx == 0,  # First card is primary
-                "credit_limit": round(user["income"] * random.uniform(0.1, 0.3), -2),
+                "credit_limit": round(user["income"] * rng.uniform(0.1, 0.3), -2),
             }
             ownerships.append(ownership)
     
@@ -205,57 +202,97 @@ def generate_card_ownership(users_df: pd.DataFrame) -> pd.DataFrame:
 def generate_transactions(
     users_df: pd.DataFrame, 
     ownership_df: pd.DataFrame, 
-    num_months: int = 3
+    num_months: int = 3,
+    rng: np.random.Generator = None,
 ) -> pd.DataFrame:
     """Generate transaction data."""
-    random.seed(RANDOM_SEED)
-    np.random.seed(RANDOM_SEED)
-    
-    transactions = []
+    if rng is None:
+        rng = np.random.default_rng(RANDOM_SEED)
     
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30 * num_months)
+    num_days = (end_date - start_date).days
     
-    for _, user in users_df.iterrows():
-        # Get user's cards
-        user_cards = ownership_df[ownership_df["user_id"] == user["user_id"]]
-        
-        if user_cards.empty:
+    # Index card ownership by user once instead of scanning it per user,
+    # with cumulative card selection weights (prefer primary card) precomputed
+    owned_card_ids = ownership_df["card_id"].to_numpy()
+    owned_weights = np.where(ownership_df["is_primary"].to_numpy(dtype=bool), 2.0, 1.0)
+    cards_by_user = {}
+    for user_id, idx in ownership_df.groupby("user_id", sort=False).indices.items():
+        cum_weights = np.cumsum(owned_weights[idx])
+        cards_by_user[user_id] = (owned_card_ids[idx], cum_weights / cum_weights[-1])
+    
+    # Number of transactions per (user, category) over the whole period.
+    # A Poisson draw with the monthly frequency scaled to the period replaces
+    # one Bernoulli(freq / 30) trial per day.
+    categories = list(TRANSACTION_CATEGORIES)
+    monthly_freqs = np.array([TRANSACTION_CATEGORIES[c]["freq"] for c in categories])
+    counts = rng.poisson(monthly_freqs * num_months, size=(len(users_df), len(categories)))
+    
+    # Users without cards have no transactions
+    counts[~users_df["user_id"].isin(list(cards_by_user)).to_numpy()] = 0
+    
+    # Preallocate one column buffer per field, filled block by block below
+    num_transactions = int(counts.sum())
+    user_ids = np.empty(num_transactions, dtype=object)
+    card_ids = np.empty(num_transactions, dtype=object)
+    amounts = np.empty(num_transactions, dtype=np.float64)
+    txn_categories = np.empty(num_transactions, dtype=object)
+    merchants = np.empty(num_transactions, dtype=object)
+    locations = np.empty(num_transactions, dtype=object)
+    timestamps = np.empty(num_transactions, dtype="datetime64[us]")
+    
+    pos = 0
+    for user_idx, (user_id, location) in enumerate(zip(users_df["user_id"], users_df["location"])):
+        if user_id not in cards_by_user:
             continue
         
-        # Generate transactions for the period
-        current_date = start_date
+        user_card_ids, cum_weights = cards_by_user[user_id]
         
-        while current_date <= end_date:
-            # Generate daily transactions
-            for category, pattern in TRANSACTION_CATEGORIES.items():
-                # Check if transaction happens today (based on monthly frequency)
-                if random.random() < pattern["freq"] / 30:
-                    # Select a card (prefer primary card)
-                    card_weights = [2.0 if card["is_primary"] else 1.0 for _, card in user_cards.iterrows()]
-                    selected_card = user_cards.sample(weights=card_weights).iloc[0]
-                    
-                    # Generate amount
-                    amount = max(10, np.random.normal(pattern["avg"], pattern["std"]))
-                    
-                    transaction = {
-                        "transaction_id": str(uuid.uuid4()),
-                        "user_id": user["user_id"],
-                        "card_id": selected_card["card_id"],
-                        "amount": round(amount, 2),
-                        "category": category,
-                        "merchant": f"{category.title()} Merchant {random.randint(1, 100)}",
-                        "location": user["location"],
-                        "timestamp": current_date + timedelta(
-                            hours=random.randint(6, 22),
-                            minutes=random.randint(0, 59)
-                        ),
-                    }
-                    transactions.append(transaction)
+        for category_idx, category in enumerate(categories):
+            num_txns = counts[user_idx, category_idx]
+            if num_txns == 0:
+                continue
+            
+            pattern = TRANSACTION_CATEGORIES[category]
+            block = slice(pos, pos + num_txns)
             
-            current_date += timedelta(days=1)
+            # Select cards (prefer primary card), amounts, merchants and times
+            user_ids[block] = user_id
+            card_ids[block] = user_card_ids[
+                cum_weights.searchsorted(rng.random(num_txns), side="right")
+            ]
+            amounts[block] = np.round(
+                np.maximum(10, rng.normal(pattern["avg"], pattern["std"], num_txns)), 2
+            )
+            txn_categories[block] = category
+            merchants[block] = [
+                f"{category.title()} Merchant {merchant_id}"
+                for merchant_id in rng.integers(1, 101, num_txns)
+            ]
+            locations[block] = location
+            timestamps[block] = (
+                np.datetime64(start_date)
+                + rng.integers(0, num_days + 1, num_txns).astype("timedelta64[D]")
+                + rng.integers(6, 23, num_txns).astype("timedelta64[h]")
+                + rng.integers(0, 60, num_txns).astype("timedelta64[m]")
+            )
+            
+            pos += num_txns
+    
+    # Sequential ids (same format as generate_simple_data), built in one pass
+    transaction_ids = np.char.add("txn_", np.char.zfill(np.arange(num_transactions).astype(str), 8))
     
-    return pd.DataFrame(transactions)
+    return pd.DataFrame({
+        "transaction_id": transaction_ids,
+        "user_id": user_ids,
+        "card_id": card_ids,
+        "amount": amounts,
+        "category": txn_categories,
+        "merchant": merchants,
+        "location": locations,
+        "timestamp": timestamps,
+    })
 
 
 def validate_data(users_df: pd.DataFrame, ownership_df: pd.DataFrame, transactions_df: pd.DataFrame) -> bool:
@@ -310,17 +347,20 @@ def main():
     
     print(f"Generating mock data for {args.users:,} users...")
     
+    # One generator shared by every step keeps the whole dataset reproducible
+    rng = np.random.default_rng(RANDOM_SEED)
+    
     # Generate data
     print("1. Generating users...")
-    users_df = generate_users(args.users)
+    users_df = generate_users(args.users, rng)
     users_df.to_csv(DATA_DIR / "users.csv", index=False)
     
     print("2. Generating card ownership...")
-    ownership_df = generate_card_ownership(users_df)
+    ownership_df = generate_card_ownership(users_df, rng)
     ownership_df.to_csv(DATA_DIR / "card_ownership.csv", index=False)
     
     print("3. Generating transactions...")
-    transactions_df = generate_transactions(users_df, ownership_df, args.months)
+    transactions_df = generate_transactions(users_df, ownership_df, args.months, rng)
     transactions_df.to_csv(DATA_DIR / "transactions.csv", index=False)
     
     # Validate data
@@ -3,112 +3,394 @@
 Preprocess raw data and compute features for Feast feature store.
 """
 
-import csv
+import argparse
+import hashlib
+import io
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
 
 # Configuration
 DATA_DIR = Path(__file__).parent.parent / "data"
 FEATURES_DIR = Path(__file__).parent.parent / "features"
 
+TRANSACTIONS_FILE = DATA_DIR / "transactions.csv"
+
+# State kept between incremental runs: per-(user, day, category) partial
+# aggregates, the raw rows still inside the 90-day window (for the window's
+# first day and transaction_id dedup), and the byte offset already read
+# from transactions.csv together with running per-category totals
+DAILY_STATS_FILE = DATA_DIR / "user_daily_stats.parquet"
+DAILY_STATS_KEYS = ["user_id", "day", "category"]
+WINDOW_TRANSACTIONS_FILE = DATA_DIR / "user_window_transactions.parquet"
+WINDOW_COLUMNS = ["transaction_id", "user_id", "category", "amount", "timestamp"]
+PREPROCESS_STATE_FILE = DATA_DIR / "preprocess_state.json"
+SOURCE_FINGERPRINT_BYTES = 65536
+
+SECONDS_PER_DAY = 86400
+
+
+def to_epoch_seconds(values) -> np.ndarray:
+    """Convert datetimes (a column or a single value) to int64 Unix seconds."""
+    return np.asarray(values, dtype="datetime64[s]").astype(np.int64)
+
+
+def load_transactions(offset: int = 0) -> Tuple[pd.DataFrame, int]:
+    """Load transactions appended after ``offset`` bytes of transactions.csv.
+    
+    Returns the rows (timestamps as int64 epoch seconds, repeated
+    transaction_ids dropped) and the offset just past the last complete line,
+    where the next incremental run resumes. A line still being written is
+    left for that run.
+    """
+    with open(TRANSACTIONS_FILE, "rb") as f:
+        header = f.readline()
+        start = max(offset, len(header))
+        f.seek(start)
+        data = f.read()
+    data = data[:data.rfind(b"\n") + 1]
+    
+    transactions = pd.read_csv(
+        io.BytesIO(header + data),
+        usecols=["transaction_id", "user_id", "card_id", "amount", "category", "timestamp"],
+        dtype={
+            "transaction_id": "string",
+            "user_id": "category",
+            "card_id": "category",
+            "amount": "float64",
+            "category": "category",
+        },
+        parse_dates=["timestamp"],
+    )
+    transactions["timestamp"] = to_epoch_seconds(transactions["timestamp"])
+    return transactions.drop_duplicates("transaction_id", ignore_index=True), start + len(data)
+
+
+def source_fingerprint(offset: int) -> str:
+    """Digest of the head of transactions.csv, to detect a regenerated file."""
+    with open(TRANSACTIONS_FILE, "rb") as f:
+        head = f.read(min(offset, SOURCE_FINGERPRINT_BYTES))
+    return hashlib.blake2b(head, digest_size=16).hexdigest()
+
 
-def load_transactions() -> List[Dict]:
-    """Load transaction data."""
-    transactions = []
-    with open(DATA_DIR / "transactions.csv", "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            row["amount"] = float(row["amount"])
-            row["timestamp"] = datetime.fromisoformat(row["timestamp"])
-            transactions.append(row)
-    return transactions
-
-
-def load_users() -> List[Dict]:
-    """Load user data."""
-    users = []
-    with open(DATA_DIR / "users.csv", "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            row["age"] = int(row["age"])
-            row["income"] = float(row["income"])
-            row["credit_score"] = int(row["credit_score"])
-            row["created_at"] = datetime.fromisoformat(row["created_at"])
-            users.append(row)
+def load_users() -> pd.DataFrame:
+    """Load user data (created_at as int64 epoch seconds)."""
+    users = pd.read_csv(
+        DATA_DIR / "users.csv",
+        usecols=["user_id", "age", "income", "credit_score", "created_at"],
+        dtype={
+            "user_id": "string",
+            "age": "int64",
+            "income": "float64",
+            "credit_score": "int64",
+        },
+        parse_dates=["created_at"],
+    )
+    users["created_at"] = to_epoch_seconds(users["created_at"])
     return users
 
 
-def compute_user_stats_90d(transactions: List[Dict]) -> List[Dict]:
-    """Compute user statistics over 90 days."""
-    # Group transactions by user
-    user_transactions = {}
-    for txn in transactions:
-        user_id = txn["user_id"]
-        if user_id not in user_transactions:
-            user_transactions[user_id] = []
-        user_transactions[user_id].append(txn)
+def stats_window_cutoff(current_time: datetime) -> int:
+    """First epoch second inside the 90-day stats window (exactly now - 90 days)."""
+    cutoff = current_time - timedelta(days=90)
+    # Round up so integer timestamps compare the same as against the exact datetime
+    return int(to_epoch_seconds(cutoff)) + (cutoff.microsecond > 0)
+
+
+def stats_window_start(current_time: datetime) -> int:
+    """Start of the day bucket holding the 90-day window cutoff, in epoch seconds."""
+    cutoff = stats_window_cutoff(current_time)
+    return cutoff - cutoff % SECONDS_PER_DAY
+
+
+def compute_daily_partials(transactions: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate transactions into per-(user, day, category) partial stats."""
+    txns = transactions.assign(
+        day=transactions["timestamp"] - transactions["timestamp"] % SECONDS_PER_DAY,
+        amount_sq=transactions["amount"] ** 2,
+    )
+    partials = txns.groupby(DAILY_STATS_KEYS, observed=True, sort=False).agg(
+        count=("amount", "count"),
+        total=("amount", "sum"),
+        total_sq=("amount_sq", "sum"),
+        max_amount=("amount", "max"),
+        min_amount=("amount", "min"),
+        last_txn=("timestamp", "max"),
+    ).reset_index()
     
-    # Compute statistics for each user
-    user_stats = []
-    current_time = datetime.now()
-    cutoff_date = current_time - timedelta(days=90)
-    
-    for user_id, txns in user_transactions.items():
-        # Filter to last 90 days
-        recent_txns = [t for t in txns if t["timestamp"] >= cutoff_date]
-        
-        if not recent_txns:
-            continue
-        
-        amounts = [t["amount"] for t in recent_txns]
-        categories = [t["category"] for t in recent_txns]
-        
-        # Calculate statistics
-        stats = {
-            "user_id": user_id,
-            "user_avg_amount": sum(amounts) / len(amounts),
-            "user_std_amount": 0.0,  # Simplified
-            "user_transaction_count": len(recent_txns),
-            "user_total_spending": sum(amounts),
-            "user_days_since_last_txn": (current_time - max(t["timestamp"] for t in recent_txns)).days,
-            "user_avg_txn_per_day": len(recent_txns) / 90,
-            "user_unique_categories": len(set(categories)),
-            "user_max_amount": max(amounts),
-            "user_min_amount": min(amounts),
-            "timestamp": current_time.isoformat(),
-        }
-        
-        # Calculate standard deviation
-        if len(amounts) > 1:
-            mean = stats["user_avg_amount"]
-            variance = sum((x - mean) ** 2 for x in amounts) / len(amounts)
-            stats["user_std_amount"] = variance ** 0.5
-        
-        user_stats.append(stats)
+    # Plain strings so partials from different runs concatenate cleanly
+    return partials.astype({"user_id": str, "category": str})
+
+
+def merge_daily_partials(previous: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Combine two sets of daily partials (every statistic is algebraic)."""
+    combined = pd.concat([previous, delta], ignore_index=True)
+    merged = combined.groupby(DAILY_STATS_KEYS, sort=False).agg(
+        count=("count", "sum"),
+        total=("total", "sum"),
+        total_sq=("total_sq", "sum"),
+        max_amount=("max_amount", "max"),
+        min_amount=("min_amount", "min"),
+        last_txn=("last_txn", "max"),
+    )
+    return merged.reset_index()
+
+
+def window_daily_partials(
+    daily_partials: pd.DataFrame, transactions: pd.DataFrame, current_time: datetime
+) -> pd.DataFrame:
+    """Daily partials covering exactly the last 90 days.
+    
+    Days after the cutoff's day come from the stored partials. The cutoff's
+    own day is only partly inside the window, so it is re-aggregated from the
+    raw transactions at or after the cutoff.
+    """
+    cutoff = stats_window_cutoff(current_time)
+    boundary_day = cutoff - cutoff % SECONDS_PER_DAY
+    
+    timestamps = transactions["timestamp"]
+    boundary_txns = transactions[(timestamps >= cutoff) & (timestamps < boundary_day + SECONDS_PER_DAY)]
+    
+    return pd.concat(
+        [daily_partials[daily_partials["day"] > boundary_day], compute_daily_partials(boundary_txns)],
+        ignore_index=True,
+    )
+
+
+def load_incremental_state() -> Dict:
+    """State saved by the previous run, or {} if it cannot be resumed from.
+    
+    The state is only valid while transactions.csv has been appended to
+    since; a regenerated or truncated file needs a full run.
+    """
+    if not all(path.exists() for path in (PREPROCESS_STATE_FILE, DAILY_STATS_FILE, WINDOW_TRANSACTIONS_FILE)):
+        return {}
+    
+    with open(PREPROCESS_STATE_FILE, "r") as f:
+        state = json.load(f)
+    
+    offset = state.get("source_offset", 0)
+    if TRANSACTIONS_FILE.stat().st_size < offset or source_fingerprint(offset) != state.get("source_fingerprint"):
+        print("transactions.csv was rewritten since the last run")
+        return {}
+    return state
+
+
+def save_parquet_atomically(frame: pd.DataFrame, path: Path) -> None:
+    """Atomically replace a stored Parquet file."""
+    tmp_path = path.with_suffix(".parquet.tmp")
+    frame.to_parquet(tmp_path, index=False, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def save_incremental_state(
+    daily_partials: pd.DataFrame, window_transactions: pd.DataFrame, source_offset: int, category_totals: Dict
+) -> None:
+    """Persist everything the next incremental run resumes from.
+    
+    Each file is replaced atomically and the JSON state (offset and category
+    totals) goes last; if a run dies between them, rerun without --incremental.
+    """
+    save_parquet_atomically(daily_partials, DAILY_STATS_FILE)
+    save_parquet_atomically(window_transactions, WINDOW_TRANSACTIONS_FILE)
+    
+    state = {
+        "source_offset": source_offset,
+        "source_fingerprint": source_fingerprint(source_offset),
+        "category_totals": category_totals,
+        "updated_at": datetime.now().isoformat(),
+    }
+    tmp_path = PREPROCESS_STATE_FILE.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, PREPROCESS_STATE_FILE)
+
+
+def aggregate_user_stats(
+    user_codes: np.ndarray,
+    counts: np.ndarray,
+    totals: np.ndarray,
+    totals_sq: np.ndarray,
+    max_amounts: np.ndarray,
+    min_amounts: np.ndarray,
+    last_txns: np.ndarray,
+    category_codes: np.ndarray,
+    num_users: int,
+    num_categories: int,
+) -> Dict[str, np.ndarray]:
+    """Roll partial aggregates up to per-user statistics from contiguous arrays.
+    
+    Rows are sorted by user once and every statistic is a single ufunc.reduceat
+    over the per-user row boundaries.
+    """
+    order = np.argsort(user_codes, kind="stable")
+    sorted_codes = user_codes[order]
+    
+    # First row of each user's run, and which user that run belongs to
+    starts = np.flatnonzero(np.diff(sorted_codes, prepend=-1))
+    present = sorted_codes[starts]
+    
+    count = np.zeros(num_users, dtype=np.int64)
+    total = np.zeros(num_users)
+    total_sq = np.zeros(num_users)
+    max_amount = np.full(num_users, -np.inf)
+    min_amount = np.full(num_users, np.inf)
+    last_txn = np.zeros(num_users, dtype=np.int64)
+    
+    if len(starts):
+        count[present] = np.add.reduceat(counts[order], starts)
+        total[present] = np.add.reduceat(totals[order], starts)
+        total_sq[present] = np.add.reduceat(totals_sq[order], starts)
+        max_amount[present] = np.maximum.reduceat(max_amounts[order], starts)
+        min_amount[present] = np.minimum.reduceat(min_amounts[order], starts)
+        last_txn[present] = np.maximum.reduceat(last_txns[order], starts)
+    
+    # Distinct (user, category) pairs, counted per user
+    user_category_pairs = np.unique(user_codes * num_categories + category_codes)
+    unique_categories = np.bincount(user_category_pairs // num_categories, minlength=num_users)
+    
+    return {
+        "count": count,
+        "total": total,
+        "total_sq": total_sq,
+        "max_amount": max_amount,
+        "min_amount": min_amount,
+        "last_txn": last_txn,
+        "unique_categories": unique_categories,
+    }
+
+
+def _aggregate_user_chunk(args: tuple) -> Dict[str, np.ndarray]:
+    """Worker entry point: aggregate one chunk of users with rebased codes."""
+    user_codes, *columns, user_offset, num_users, num_categories = args
+    return aggregate_user_stats(user_codes - user_offset, *columns, num_users, num_categories)
+
+
+def aggregate_user_stats_parallel(
+    user_codes: np.ndarray,
+    columns: list,
+    num_users: int,
+    num_categories: int,
+    workers: int,
+) -> Dict[str, np.ndarray]:
+    """Run aggregate_user_stats over contiguous user ranges in worker processes."""
+    # Sort rows by user once so every chunk is a contiguous slice of rows
+    order = np.argsort(user_codes, kind="stable")
+    sorted_codes = user_codes[order]
+    sorted_columns = [column[order] for column in columns]
+    
+    # Split at user boundaries into one range of users per worker
+    user_bounds = np.linspace(0, num_users, workers + 1).astype(np.int64)
+    row_bounds = np.searchsorted(sorted_codes, user_bounds)
+    
+    tasks = [
+        (
+            sorted_codes[row_start:row_end],
+            *(column[row_start:row_end] for column in sorted_columns),
+            user_start,
+            user_end - user_start,
+            num_categories,
+        )
+        for user_start, user_end, row_start, row_end in zip(
+            user_bounds[:-1], user_bounds[1:], row_bounds[:-1], row_bounds[1:]
+        )
+    ]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_aggregate_user_chunk, tasks))
+    
+    return {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+
+
+def compute_user_stats_90d(
+    daily_partials: pd.DataFrame,
+    transactions: pd.DataFrame,
+    workers: int = 1,
+    current_time: datetime = None,
+) -> pd.DataFrame:
+    """Compute user statistics over 90 days from daily partial aggregates.
+    
+    ``transactions`` supplies the raw rows of the day the window starts on.
+    With workers > 1 users are partitioned across that many processes.
+    """
+    if current_time is None:
+        current_time = datetime.now()
+    
+    # Filter to last 90 days
+    recent = window_daily_partials(daily_partials, transactions, current_time)
+    
+    # Factorize ids to dense int codes (users in order of first appearance)
+    user_codes, user_ids = pd.factorize(recent["user_id"])
+    category_codes, categories = pd.factorize(recent["category"])
+    
+    columns = [
+        recent["count"].to_numpy(dtype=np.float64),
+        recent["total"].to_numpy(dtype=np.float64),
+        recent["total_sq"].to_numpy(dtype=np.float64),
+        recent["max_amount"].to_numpy(dtype=np.float64),
+        recent["min_amount"].to_numpy(dtype=np.float64),
+        recent["last_txn"].to_numpy(dtype=np.int64),
+        category_codes,
+    ]
+    
+    if workers > 1 and len(user_ids) >= workers:
+        agg = aggregate_user_stats_parallel(
+            user_codes, columns, len(user_ids), len(categories), workers
+        )
+    else:
+        agg = aggregate_user_stats(user_codes, *columns, len(user_ids), len(categories))
+    
+    # Mean and std are derived from the running sum and sum of squares
+    mean = agg["total"] / agg["count"]
+    variance = np.maximum(agg["total_sq"] / agg["count"] - mean ** 2, 0.0)
+    days_since_last = (to_epoch_seconds(current_time) - agg["last_txn"]) // SECONDS_PER_DAY
+    
+    # Calculate statistics
+    user_stats = pd.DataFrame({
+        "user_id": np.asarray(user_ids, dtype=object),
+        "user_avg_amount": mean,
+        "user_std_amount": np.sqrt(variance),
+        "user_transaction_count": agg["count"],
+        "user_total_spending": agg["total"],
+        "user_days_since_last_txn": days_since_last,
+        "user_avg_txn_per_day": agg["count"] / 90,
+        "user_unique_categories": agg["unique_categories"],
+        "user_max_amount": agg["max_amount"],
+        "user_min_amount": agg["min_amount"],
+        "timestamp": current_time.isoformat(),
+    })
     
     return user_stats
 
 
-def compute_category_stats_global(transactions: List[Dict]) -> List[Dict]:
-    """Compute global category statistics."""
-    # Group by category
-    category_amounts = {}
-    category_counts = {}
-    
-    for txn in transactions:
-        category = txn["category"]
-        amount = txn["amount"]
-        
-        if category not in category_amounts:
-            category_amounts[category] = []
-            category_counts[category] = 0
-        
-        category_amounts[category].append(amount)
-        category_counts[category] += 1
-    
-    # Compute averages
+def compute_category_totals(transactions: pd.DataFrame) -> Dict[str, List]:
+    """Total amount and transaction count per category, as [total, count]."""
+    # Sum and count per category code in two C passes
+    category_codes, categories = pd.factorize(transactions["category"])
+    sums = np.bincount(
+        category_codes, weights=transactions["amount"].to_numpy(dtype=np.float64), minlength=len(categories)
+    )
+    counts = np.bincount(category_codes, minlength=len(categories))
+    return {str(category): [float(total), int(count)] for category, total, count in zip(categories, sums, counts)}
+
+
+def merge_category_totals(previous: Dict[str, List], delta: Dict[str, List]) -> Dict[str, List]:
+    """Combine two sets of category totals (sums and counts just add)."""
+    merged = dict(previous)
+    for category, (total, count) in delta.items():
+        previous_total, previous_count = merged.get(category, (0.0, 0))
+        merged[category] = [previous_total + total, previous_count + count]
+    return merged
+
+
+def compute_category_stats_global(category_totals: Dict[str, List]) -> pd.DataFrame:
+    """Compute global category statistics from per-category totals."""
     stats = {
         "timestamp": datetime.now().isoformat(),
     }
@@ -116,80 +398,107 @@ def compute_category_stats_global(transactions: List[Dict]) -> List[Dict]:
     # Add category-specific stats
     for category in ["groceries", "dining", "gas", "travel", "entertainment", 
                     "online_shopping", "utilities", "healthcare", "streaming", "other"]:
-        if category in category_amounts and category_amounts[category]:
-            avg_amount = sum(category_amounts[category]) / len(category_amounts[category])
-            count = category_counts[category]
-        else:
-            avg_amount = 0.0
-            count = 0
-        
-        stats[f"category_avg_amount_{category}"] = avg_amount
-        stats[f"category_count_{category}"] = count
+        total, count = category_totals.get(category, (0.0, 0))
+        stats[f"category_avg_amount_{category}"] = float(total / count) if count else 0.0
+        stats[f"category_count_{category}"] = int(count)
     
-    return [stats]  # Global stats as single row
+    return pd.DataFrame([stats])  # Global stats as single row
 
 
-def compute_user_profile_features(users: List[Dict]) -> List[Dict]:
+def compute_user_profile_features(users: pd.DataFrame) -> pd.DataFrame:
     """Compute user profile features."""
     current_time = datetime.now()
     
-    user_features = []
-    for user in users:
-        features = {
-            "user_id": user["user_id"],
-            "user_age": user["age"],
-            "user_income": user["income"], 
-            "user_credit_score": user["credit_score"],
-            "user_account_age_days": (current_time - user["created_at"]).days,
-            "timestamp": current_time.isoformat(),
-        }
-        user_features.append(features)
-    
-    return user_features
-
-
-def save_features_to_csv(features: List[Dict], filename: str) -> None:
-    """Save computed features to CSV."""
-    if not features:
-        print(f"No features to save for {filename}")
+    return pd.DataFrame({
+        "user_id": users["user_id"],
+        "user_age": users["age"],
+        "user_income": users["income"],
+        "user_credit_score": users["credit_score"],
+        "user_account_age_days": (to_epoch_seconds(current_time) - users["created_at"]) // SECONDS_PER_DAY,
+        "timestamp": current_time.isoformat(),
+    })
+
+
+def save_features_to_parquet(features: pd.DataFrame, name: str) -> None:
+    """Save computed features to Parquet, with a CSV copy."""
+    if features.empty:
+        print(f"No features to save for {name}")
         return
     
-    output_path = DATA_DIR / filename
-    fieldnames = features[0].keys()
+    # Save as parquet (primary format)
+    parquet_path = DATA_DIR / f"{name}.parquet"
+    features.to_parquet(parquet_path, index=False, compression="zstd")
     
-    with open(output_path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(features)
+    # Save as CSV (backup format)
+    csv_path = DATA_DIR / f"{name}.csv"
+    features.to_csv(csv_path, index=False)
     
-    print(f"Saved {len(features)} feature rows to {output_path}")
+    print(f"Saved {len(features)} feature rows to {parquet_path}")
 
 
 def main():
     """Main preprocessing pipeline."""
+    parser = argparse.ArgumentParser(description="Preprocess RecEngine features")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only read transactions appended to transactions.csv since the last run "
+                             "(falls back to a full run if the file was regenerated)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes for user aggregation (default: 1)")
+    args = parser.parse_args()
+    
     print("Starting feature preprocessing...")
+    current_time = datetime.now()
+    state = load_incremental_state() if args.incremental else {}
     
-    # Load raw data
+    # Load raw data; incremental runs only read the bytes appended since
+    # the last run, whatever their timestamps
     print("Loading transactions...")
-    transactions = load_transactions()
+    transactions, source_offset = load_transactions(state.get("source_offset", 0))
     print(f"Loaded {len(transactions)} transactions")
     
     print("Loading users...")
     users = load_users()
     print(f"Loaded {len(users)} users")
     
+    # Fold the new transactions into the stored daily partials, window rows
+    # and category totals
+    if state:
+        window_transactions = pd.read_parquet(WINDOW_TRANSACTIONS_FILE)
+        transactions = transactions[~transactions["transaction_id"].isin(window_transactions["transaction_id"])]
+        print(f"Incremental run: {len(transactions)} new transactions")
+        daily_partials = merge_daily_partials(
+            pd.read_parquet(DAILY_STATS_FILE), compute_daily_partials(transactions)
+        )
+        category_totals = merge_category_totals(state["category_totals"], compute_category_totals(transactions))
+        window_transactions = pd.concat(
+            [window_transactions, transactions[WINDOW_COLUMNS].astype({"user_id": str, "category": str})],
+            ignore_index=True,
+        )
+    else:
+        daily_partials = compute_daily_partials(transactions)
+        category_totals = compute_category_totals(transactions)
+        window_transactions = transactions[WINDOW_COLUMNS].astype({"user_id": str, "category": str})
+    
+    # Days before the one holding the 90-day cutoff are no longer needed
+    window_start = stats_window_start(current_time)
+    daily_partials = daily_partials[daily_partials["day"] >= window_start]
+    window_transactions = window_transactions[window_transactions["timestamp"] >= window_start]
+    save_incremental_state(daily_partials, window_transactions, source_offset, category_totals)
+    
     # Compute features
     print("Computing user stats (90d)...")
-    user_stats = compute_user_stats_90d(transactions)
-    save_features_to_csv(user_stats, "user_stats_90d_features.csv")
+    user_stats = compute_user_stats_90d(
+        daily_partials, window_transactions, workers=args.workers, current_time=current_time
+    )
+    save_features_to_parquet(user_stats, "user_stats_90d_features")
     
     print("Computing category stats (global)...")
-    category_stats = compute_category_stats_global(transactions)
-    save_features_to_csv(category_stats, "category_stats_global_features.csv")
+    category_stats = compute_category_stats_global(category_totals)
+    save_features_to_parquet(category_stats, "category_stats_global_features")
     
     print("Computing user profile features...")
     user_profile_features = compute_user_profile_features(users)
-    save_features_to_csv(user_profile_features, "user_profile_features.csv")
+    save_features_to_parquet(user_profile_features, "user_profile_features")
     
     print("✅ Feature preprocessing complete!")
     
@@ -4,21 +4,31 @@ FastAPI application for RecEngine online serving.
 Provides real-time ML-powered credit card recommendations.
 """
 
-import json
+import asyncio
+import csv
+import hashlib
+import os
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache, partial
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+import numpy as np
+import orjson
+
 # Add utils to path
 sys.path.append(str(Path(__file__).parent))
 
 # Real FastAPI imports
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 
 # Import our ML utilities
 try:
@@ -29,32 +39,111 @@ except ImportError:
     RewardCalculator = None
     ActionSelector = None
 
+# Redis is optional: without it cooldowns are tracked per process
+try:
+    import redis.asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:
+    aioredis = None
+    RedisError = ()  # Nothing to catch without a Redis client
+
 # Configuration
 DATA_DIR = Path(__file__).parent.parent / "data"
 MODELS_DIR = Path(__file__).parent.parent / "models"
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Cooldown tracking
+COOLDOWN_MINUTES = 60
+COOLDOWN_ENABLED = False  # Temporarily disable cooldown for testing
+COOLDOWN_KEY_PREFIX = "cd:"
+MAX_LOCAL_COOLDOWNS = 100_000  # LRU bound for the in-process fallback
+
+# Monthly spending assumed when a ranking request doesn't provide one
+DEFAULT_SPENDING_PATTERN = {
+    "dining": 600,
+    "groceries": 400,
+    "gas": 200,
+    "travel": 150,
+    "other": 1650
+}
+
+# Personalized ranking response cache
+RANK_CACHE_TTL_SECONDS = 60
+RANK_CACHE_MAX_ENTRIES = 50_000
+
+# How categories are named in recommendation reasoning
+CATEGORY_DISPLAY = {
+    'dining': 'restaurants',
+    'travel': 'travel',
+    'groceries': 'groceries',
+    'gas': 'gas stations',
+    'shopping': 'shopping'
+}
+
+# Trigger rules checked in order (focus on reward gap percentage + smart thresholds):
+# (min reward gap %, min extra reward $, min amount $, confidence(gap), category reasoning)
+NO_MIN = float("-inf")
+TRIGGER_RULES = [
+    # Very high reward gap always triggers
+    (200, NO_MIN, NO_MIN, lambda gap: min(0.95, 0.7 + gap / 500), True),
+    # Good gap + small absolute benefit
+    (100, 0.05, NO_MIN, lambda gap: min(0.85, 0.6 + gap / 300), True),
+    # Meaningful absolute savings
+    (NO_MIN, 0.15, NO_MIN, lambda gap: 0.8, False),
+    (50, 0.10, 100, lambda gap: 0.7, True),
+    (75, 0.05, 30, lambda gap: 0.65, True),
+]
+
+# Model files loaded at startup (models key -> file in MODELS_DIR)
+MODEL_FILES = {
+    "trigger_classifier": "trigger_classifier_latest.json",
+    "card_ranker": "card_ranker_latest.json",
+    "hyperparameters": "optuna_combined_optimization.json",  # Optuna results
+}
+
+# Spending categories with a dedicated column in the catalog rate matrix
+# (bonus categories found in the catalog are appended at load time)
+RANKING_CATEGORIES = ["dining", "groceries", "gas", "travel", "other"]
 
 # Initialize FastAPI app
 app = FastAPI(
     title="RecEngine API",
     version="1.0.0",
-    description="Credit card recommendation engine with ML-powered insights"
+    description="Credit card recommendation engine with ML-powered insights",
+    default_response_class=ORJSONResponse
 )
 
 # Add startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize the application on startup."""
-    startup()
+    startup(await read_model_files())
+    await connect_cooldown_store()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release resources on shutdown."""
+    shutdown()
+    if redis_client is not None:
+        await redis_client.close()
 
 # Global state
 models = {}
 reward_calculator = None
 action_selector = None
-user_cooldowns = {}  # In-memory cooldown tracking
+models_info_response = None  # Built once per load_models()
+redis_client = None  # Shared cooldown store when REDIS_URL is configured
+user_cooldowns = OrderedDict()  # In-memory cooldown fallback (user_id -> datetime, LRU order)
+analysis_inflight = {}  # (category, current_card_id, amount) -> Task of a running analysis
+rank_cache = OrderedDict()  # request key -> (monotonic expiry, catalog, RankingResponse), LRU order
 
 # Request/Response models
+# Requests are validated once on the way in; responses are built from
+# already-typed values with model_construct() to skip re-validation
 class TransactionRequest(BaseModel):
     """Request for transaction analysis."""
+    model_config = ConfigDict(extra="ignore")
+    
     user_id: str
     amount: float
     category: str
@@ -64,6 +153,8 @@ class TransactionRequest(BaseModel):
 
 class RankingRequest(BaseModel):
     """Request for personalized ranking."""
+    model_config = ConfigDict(extra="ignore")
+    
     user_id: str
     user_cards: Optional[List[str]] = None
     spending_pattern: Optional[Dict[str, float]] = None
@@ -71,6 +162,8 @@ class RankingRequest(BaseModel):
 
 class RewardEstimationRequest(BaseModel):
     """Request for reward estimation."""
+    model_config = ConfigDict(extra="ignore")
+    
     user_id: str
     card_id: str
     projected_spending: Dict[str, float]
@@ -78,6 +171,8 @@ class RewardEstimationRequest(BaseModel):
 
 class PortfolioOptimizationRequest(BaseModel):
     """Request for portfolio optimization."""
+    model_config = ConfigDict(extra="ignore")
+    
     user_id: str
     current_cards: List[str]
     spending_pattern: Dict[str, float]
@@ -126,28 +221,45 @@ class ModelInfoResponse(BaseModel):
 # Startup time for uptime calculation
 startup_time = time.time()
 
-def load_models():
-    """Load ML models from MLflow (mock implementation)."""
-    global models, reward_calculator, action_selector
+# Serialized /health body, reused for HEALTH_CACHE_SECONDS (probes hit it constantly)
+HEALTH_CACHE_SECONDS = 1.0
+health_cache = (0.0, b"")  # (monotonic expiry, JSON body)
+
+def read_model_file(name: str) -> Optional[Dict]:
+    """Read and parse one model file (None if it doesn't exist)."""
+    path = MODELS_DIR / MODEL_FILES[name]
+    if not path.exists():
+        return None
+    return orjson.loads(path.read_bytes())
+
+async def read_model_files() -> Dict[str, Any]:
+    """Read all model files concurrently (failures are returned, not raised)."""
+    results = await asyncio.gather(
+        *(asyncio.to_thread(read_model_file, name) for name in MODEL_FILES),
+        return_exceptions=True
+    )
+    return dict(zip(MODEL_FILES, results))
+
+def load_models(model_data: Optional[Dict[str, Any]] = None):
+    """Load ML models from MLflow (mock implementation).
+    
+    model_data holds already-read files from read_model_files(); without it
+    the files are read here one after another.
+    """
+    global models, reward_calculator, action_selector, models_info_response
     
     try:
-        # Load trigger classifier
-        trigger_path = MODELS_DIR / "trigger_classifier_latest.json"
-        if trigger_path.exists():
-            with open(trigger_path, "r") as f:
-                models["trigger_classifier"] = json.load(f)
-        
-        # Load ranker model
-        ranker_path = MODELS_DIR / "card_ranker_latest.json"
-        if ranker_path.exists():
-            with open(ranker_path, "r") as f:
-                models["card_ranker"] = json.load(f)
-        
-        # Load Optuna results
-        optuna_path = MODELS_DIR / "optuna_combined_optimization.json"
-        if optuna_path.exists():
-            with open(optuna_path, "r") as f:
-                models["hyperparameters"] = json.load(f)
+        if model_data is None:
+            model_data = {name: read_model_file(name) for name in MODEL_FILES}
+        
+        for name, data in model_data.items():
+            if isinstance(data, Exception):
+                raise data
+            if data is not None:
+                models[name] = data
+        
+        # Model info only changes when models are reloaded
+        models_info_response = build_models_info()
         
         # Initialize utility classes
         if RewardCalculator:
@@ -162,10 +274,87 @@ def load_models():
         print(f"❌ Failed to load models: {e}")
         return False
 
-def check_user_cooldown(user_id: str, cooldown_minutes: int = 1) -> bool:
+def build_models_info() -> ModelInfoResponse:
+    """Summarize the loaded models."""
+    model_info = {}
+    
+    for model_name, model_data in models.items():
+        if isinstance(model_data, dict):
+            model_info[model_name] = {
+                "type": model_data.get("model_type", "unknown"),
+                "metrics": model_data.get("metrics", {}),
+                "params": model_data.get("params", {}),
+                "features": len(model_data.get("feature_names", []))
+            }
+    
+    return ModelInfoResponse(
+        models=model_info,
+        last_updated=datetime.now().isoformat(),
+        version="1.0.0"
+    )
+
+async def analyze_transaction_coalesced(amount: float, category: str, current_card_id: Optional[str]):
+    """Run reward analysis in a thread, sharing one run between identical concurrent requests."""
+    key = (category, current_card_id, amount)
+    task = analysis_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(asyncio.to_thread(
+            reward_calculator.analyze_transaction,
+            amount=amount,
+            category=category,
+            current_card_id=current_card_id
+        ))
+        analysis_inflight[key] = task
+        task.add_done_callback(partial(_finish_coalesced_analysis, key))
+    
+    # Shielded so a cancelled request, leader or follower, never cancels the shared run
+    return await asyncio.shield(task)
+
+def _finish_coalesced_analysis(key: Tuple, task: asyncio.Future):
+    """Drop a finished analysis from the in-flight table."""
+    del analysis_inflight[key]
+    if not task.cancelled():
+        task.exception()  # Mark retrieved when every waiter has gone
+
+def get_category_reasoning(category: str, best_card: Any, current_rate: float, best_rate: float) -> str:
+    """Generate category-specific reasoning for a trigger recommendation."""
+    category_display = CATEGORY_DISPLAY.get(category, category)
+    
+    if best_card.reward_type in ('points', 'miles'):
+        return f"Earns {best_rate:.0f}x {best_card.reward_type} on {category_display} vs your current {current_rate:.1f}x"
+    else:
+        return f"Earns {best_rate:.0f}% cashback on {category_display} vs your current {current_rate:.1f}%"
+
+async def connect_cooldown_store():
+    """Connect to Redis for cooldown tracking, falling back to process memory."""
+    global redis_client
+    
+    if not REDIS_URL or aioredis is None:
+        print("ℹ️ Redis not configured, tracking cooldowns in memory")
+        return
+    
+    client = aioredis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        await client.ping()
+    except Exception as e:
+        print(f"⚠️ Warning: Redis unavailable ({e}), tracking cooldowns in memory")
+        await client.close()
+        return
+    
+    redis_client = client
+    print("✅ Connected to Redis for cooldown tracking")
+
+async def check_user_cooldown(user_id: str, cooldown_minutes: int = COOLDOWN_MINUTES) -> bool:
     """Check if user is in cooldown period."""
-    # Temporarily disable cooldown for testing
-    return False
+    if not COOLDOWN_ENABLED:
+        return False
+    
+    if redis_client is not None:
+        try:
+            # Keys expire on their own once the cooldown is over
+            return bool(await redis_client.exists(COOLDOWN_KEY_PREFIX + user_id))
+        except RedisError as e:
+            print(f"⚠️ Warning: Redis cooldown read failed ({e}), using in-memory cooldowns")
     
     if user_id not in user_cooldowns:
         return False
@@ -175,72 +364,276 @@ def check_user_cooldown(user_id: str, cooldown_minutes: int = 1) -> bool:
     
     return datetime.now() - last_recommendation < cooldown_period
 
-def update_user_cooldown(user_id: str):
-    """Update user's last recommendation timestamp."""
+async def update_user_cooldown(user_id: str, cooldown_minutes: int = COOLDOWN_MINUTES):
+    """Start the user's cooldown period."""
+    if not COOLDOWN_ENABLED:
+        # Nothing reads cooldowns while they are disabled
+        return
+    
+    if redis_client is not None:
+        try:
+            await redis_client.set(COOLDOWN_KEY_PREFIX + user_id, "1", ex=cooldown_minutes * 60)
+            return
+        except RedisError as e:
+            print(f"⚠️ Warning: Redis cooldown write failed ({e}), using in-memory cooldowns")
+    
     user_cooldowns[user_id] = datetime.now()
+    user_cooldowns.move_to_end(user_id)
+    if len(user_cooldowns) > MAX_LOCAL_COOLDOWNS:
+        user_cooldowns.popitem(last=False)
 
-def load_card_catalog() -> List[Dict]:
-    """Load card catalog for recommendations."""
-    cards = []
-    catalog_path = DATA_DIR / "card_catalog.csv"
+@dataclass(slots=True, frozen=True)
+class CardRecord:
+    """One parsed card catalog row."""
+    card_id: str
+    issuer: str
+    base_rate: float
+    annual_fee: float
+    signup_bonus: float
+    bonus_categories: Dict[str, float]
+    reward_type: str
+    point_value_cent: float
+    is_cashback: bool
+
+@dataclass
+class CardCatalogArrays:
+    """Card catalog as parallel arrays (one row per card) for vectorized scoring."""
+    card_ids: List[str]
+    index: Dict[str, int]  # card_id -> row
+    records: List[CardRecord]  # for building responses of selected cards
+    categories: Dict[str, int]  # category -> column in rates
+    rates: np.ndarray  # [N, K] reward rate per category, base rate where no bonus
+    base_rate: np.ndarray  # [N]
+    annual_fee: np.ndarray  # [N]
+    signup_bonus: np.ndarray  # [N]
+    reward_value: np.ndarray  # [N] dollars per unit of rate (cashback %, or points x point value)
+
+
+def build_card_catalog_arrays(cards: List[CardRecord]) -> CardCatalogArrays:
+    """Build the structure-of-arrays view of the card catalog."""
+    bonus_by_card = [card.bonus_categories for card in cards]
+    
+    categories = {category: idx for idx, category in enumerate(RANKING_CATEGORIES)}
+    for bonus_categories in bonus_by_card:
+        for category in bonus_categories:
+            categories.setdefault(category, len(categories))
+    
+    base_rate = np.array([card.base_rate for card in cards])
+    rates = np.repeat(base_rate[:, None], len(categories), axis=1)
+    for row, bonus_categories in enumerate(bonus_by_card):
+        for category, rate in bonus_categories.items():
+            rates[row, categories[category]] = rate
     
-    if not catalog_path.exists():
-        return []
+    return CardCatalogArrays(
+        card_ids=[card.card_id for card in cards],
+        index={card.card_id: row for row, card in enumerate(cards)},
+        records=cards,
+        categories=categories,
+        rates=rates,
+        base_rate=base_rate,
+        annual_fee=np.array([card.annual_fee for card in cards]),
+        signup_bonus=np.array([card.signup_bonus for card in cards]),
+        # Cashback is a simple percentage, points/miles need value conversion
+        reward_value=np.array([
+            1.0 if card.is_cashback else card.point_value_cent for card in cards
+        ]) / 100,
+    )
+
+
+@lru_cache(maxsize=4)
+def _load_card_catalog_cached(path_str: str, mtime: float) -> Tuple[List[CardRecord], Optional[CardCatalogArrays]]:
+    """Parse the card catalog once per (path, mtime) and build its array view."""
+    cards = []
     
-    import csv
-    with open(catalog_path, "r") as f:
+    with open(path_str, "r") as f:
         reader = csv.DictReader(f)
         for row in reader:
+            # Parse bonus categories JSON
+            try:
+                bonus_categories = orjson.loads(row.get("bonus_categories") or "{}")
+            except orjson.JSONDecodeError:
+                bonus_categories = {}
+            
             # Convert numeric fields
-            row["base_rate_pct"] = float(row.get("base_rate_pct", 1.0))
-            row["annual_fee"] = float(row.get("annual_fee", 0))
-            row["signup_bonus_value"] = float(row.get("signup_bonus_value", 0))
-            cards.append(row)
+            cards.append(CardRecord(
+                card_id=row["card_id"],
+                issuer=row.get("issuer", "Unknown"),
+                base_rate=float(row.get("base_rate_pct", 1.0)),
+                annual_fee=float(row.get("annual_fee", 0)),
+                signup_bonus=float(row.get("signup_bonus_value", 0)),
+                bonus_categories={category: float(rate) for category, rate in bonus_categories.items()},
+                reward_type=row["reward_type"],
+                point_value_cent=float(row.get("point_value_cent", 1.0)),
+                is_cashback=row["reward_type"] == "cashback",
+            ))
     
-    return cards
+    return cards, build_card_catalog_arrays(cards) if cards else None
+
+
+def _card_catalog() -> Tuple[List[CardRecord], Optional[CardCatalogArrays]]:
+    """Current catalog, re-parsed only when the CSV file changes."""
+    catalog_path = DATA_DIR / "card_catalog.csv"
+    try:
+        mtime = catalog_path.stat().st_mtime
+    except FileNotFoundError:
+        return [], None
+    return _load_card_catalog_cached(str(catalog_path), mtime)
+
+
+def load_card_catalog() -> List[CardRecord]:
+    """Load card catalog for recommendations (shared, do not mutate)."""
+    return _card_catalog()[0]
+
+
+def load_card_catalog_arrays() -> Optional[CardCatalogArrays]:
+    """Load the structure-of-arrays view of the card catalog."""
+    return _card_catalog()[1]
+
+def top_k_indices(scores: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+    """Candidates with the k highest scores, best first, earlier rows winning ties."""
+    candidate_scores = scores[candidates]
+    if len(candidates) > k:
+        # O(N) partition for the k-th best score, then keep everything at or
+        # above it so ties at the cut are resolved by row order below
+        kth_score = np.partition(candidate_scores, len(candidates) - k)[len(candidates) - k]
+        keep = candidate_scores >= kth_score
+        candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+    return candidates[np.argsort(-candidate_scores, kind="stable")[:k]]
+
+def _rank_cache_key(user_id: str, user_cards: List[str], spending_pattern: Dict[str, float]) -> bytes:
+    """Cache key for a ranking request (spending order kept, it breaks reason ties)."""
+    payload = orjson.dumps([user_id, sorted(user_cards), list(spending_pattern.items())])
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+def _score_kernel(
+    pattern_rates: np.ndarray,
+    monthly_amounts: np.ndarray,
+    reward_value: np.ndarray,
+    annual_fee: np.ndarray,
+    signup_bonus: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Ranking score of every card from the catalog arrays, as whole-array math.
+    
+    Returns (net_benefit [N], scores [N]).
+    """
+    yearly_amounts = monthly_amounts * 12
+    total_spending = yearly_amounts.sum()
+    
+    # Annual reward per card as a single matrix-vector product
+    annual_reward = (pattern_rates @ yearly_amounts) * reward_value
+    
+    # Subtract annual fee
+    net_benefit = annual_reward - annual_fee
+    
+    # Calculate composite score
+    
+    # Base score from net benefit (normalized)
+    benefit_score = np.minimum(net_benefit / 1000, 1.0) * 0.5
+    
+    # Reward rate effectiveness
+    if total_spending > 0:
+        effectiveness_score = np.minimum(annual_reward / total_spending * 10, 1.0) * 0.3
+    else:
+        effectiveness_score = 0
+    
+    # Annual fee penalty (less penalty for high spenders)
+    if total_spending > 36000:  # $3k/month
+        fee_penalty = np.minimum(annual_fee / 1000, 0.1)
+    else:
+        fee_penalty = np.minimum(annual_fee / 500, 0.2)
+    
+    # Signup bonus contribution (amortized over 2 years)
+    bonus_score = np.minimum(signup_bonus / 2000, 0.2)
+    
+    # Calculate final score
+    scores = np.clip(benefit_score + effectiveness_score + bonus_score - fee_penalty, 0.1, 1.0)
+    
+    return net_benefit, scores
+
+def _rank_cards(
+    catalog: CardCatalogArrays,
+    spending_pattern: Dict[str, float],
+    user_cards: List[str],
+) -> List[Dict[str, Any]]:
+    """Score every catalog card for a spending pattern and return the top 5."""
+    # Reward rate of every card for each spending category [N, P]
+    # (categories without a column earn the base rate)
+    pattern_categories = list(spending_pattern)
+    monthly_amounts = np.array([float(spending_pattern[c]) for c in pattern_categories])
+    pattern_rates = np.column_stack([
+        catalog.rates[:, catalog.categories[c]] if c in catalog.categories else catalog.base_rate
+        for c in pattern_categories
+    ])
+    
+    net_benefit, scores = _score_kernel(
+        pattern_rates, monthly_amounts, catalog.reward_value, catalog.annual_fee, catalog.signup_bonus
+    )
+    
+    # Rank cards the user doesn't already have, keeping catalog order on ties
+    candidates = np.flatnonzero(~np.isin(catalog.card_ids, user_cards))
+    top_idx = top_k_indices(scores, candidates, 5)
+    
+    top_cards = []
+    for idx in top_idx:
+        # Generate recommendation reason from the top rewarding category
+        if net_benefit[idx] <= 0:
+            reason = "Consider if you value the card's additional benefits"
+        else:
+            # Per-category breakdown is only needed for the returned cards
+            category_breakdown = pattern_rates[idx] * (monthly_amounts * 12) * catalog.reward_value[idx]
+            top_cat = pattern_categories[int(np.argmax(category_breakdown))]
+            reason = f"Excellent rewards for your {top_cat.replace('_', ' ').title()} spending"
+        
+        card = catalog.records[idx]
+        top_cards.append({
+            "card_id": card.card_id,
+            "issuer": card.issuer,
+            "card_name": card.card_id.replace("_", " ").title(),
+            "ranking_score": float(scores[idx]),
+            "annual_fee": card.annual_fee,
+            "signup_bonus": card.signup_bonus,
+            "reason": reason
+        })
+    
+    return top_cards
 
 # API Endpoints
 
-@app.get("/health")
-def health_check() -> HealthResponse:
+@app.get("/health", response_model=HealthResponse)
+async def health_check() -> Response:
     """Health check endpoint."""
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now().isoformat(),
-        models_loaded=len(models) > 0,
-        uptime_seconds=time.time() - startup_time
-    )
+    global health_cache
+    
+    now = time.monotonic()
+    expires, body = health_cache
+    if now >= expires:
+        body = orjson.dumps(HealthResponse.model_construct(
+            status="healthy",
+            timestamp=datetime.now().isoformat(),
+            models_loaded=len(models) > 0,
+            uptime_seconds=time.time() - startup_time
+        ).model_dump())
+        health_cache = (now + HEALTH_CACHE_SECONDS, body)
+    
+    return Response(content=body, media_type="application/json")
 
 @app.get("/models/info")
-def models_info() -> ModelInfoResponse:
+async def models_info() -> ModelInfoResponse:
     """Get information about loaded models."""
-    model_info = {}
-    
-    for model_name, model_data in models.items():
-        if isinstance(model_data, dict):
-            model_info[model_name] = {
-                "type": model_data.get("model_type", "unknown"),
-                "metrics": model_data.get("metrics", {}),
-                "params": model_data.get("params", {}),
-                "features": len(model_data.get("feature_names", []))
-            }
-    
-    return ModelInfoResponse(
-        models=model_info,
-        last_updated=datetime.now().isoformat(),
-        version="1.0.0"
-    )
+    if models_info_response is None:
+        return build_models_info()
+    return models_info_response
 
 @app.post("/trigger-classify")
-def trigger_classify(request: TransactionRequest) -> TriggerResponse:
+async def trigger_classify(request: TransactionRequest) -> TriggerResponse:
     """
     Classify if a transaction should trigger a recommendation.
     Returns recommendation flag, confidence, and suggested card.
     """
     
     # Check cooldown
-    if check_user_cooldown(request.user_id, cooldown_minutes=60):
-        return TriggerResponse(
+    if await check_user_cooldown(request.user_id):
+        return TriggerResponse.model_construct(
             recommend_flag=False,
             confidence_score=0.0,
             suggested_card_id="",
@@ -257,10 +650,8 @@ def trigger_classify(request: TransactionRequest) -> TriggerResponse:
     
     try:
         # Analyze transaction rewards
-        analysis = reward_calculator.analyze_transaction(
-            amount=request.amount,
-            category=request.category,
-            current_card_id=request.current_card_id
+        analysis = await analyze_transaction_coalesced(
+            request.amount, request.category, request.current_card_id
         )
         
         # Mock trigger classification (in real system would use actual model)
@@ -269,56 +660,26 @@ def trigger_classify(request: TransactionRequest) -> TriggerResponse:
         confidence = 0.5
         reasoning = "No significant benefit found"
         
-        # Generate category-specific reasoning
-        def get_category_reasoning(category: str, best_card: any, current_rate: float, best_rate: float) -> str:
-            category_display = {
-                'dining': 'restaurants',
-                'travel': 'travel',
-                'groceries': 'groceries', 
-                'gas': 'gas stations',
-                'shopping': 'shopping'
-            }.get(category, category)
-            
-            if best_card.reward_type in ['points', 'miles']:
-                return f"Earns {best_rate:.0f}x {best_card.reward_type} on {category_display} vs your current {current_rate:.1f}x"
-            else:
-                return f"Earns {best_rate:.0f}% cashback on {category_display} vs your current {current_rate:.1f}%"
-
-        # Business rules for triggering (focus on reward gap percentage + smart thresholds)
-        if analysis.reward_gap_pct > 200:  # Very high reward gap always triggers
-            should_trigger = True
-            confidence = min(0.95, 0.7 + (analysis.reward_gap_pct / 500))
-            reasoning = get_category_reasoning(request.category, analysis.best_card_reward, 
-                                            analysis.current_card_reward.applicable_rate if analysis.current_card_reward else 0,
-                                            analysis.best_card_reward.applicable_rate)
-        elif analysis.reward_gap_pct > 100 and analysis.extra_reward_amt > 0.05:  # Good gap + small absolute benefit
-            should_trigger = True
-            confidence = min(0.85, 0.6 + (analysis.reward_gap_pct / 300))
-            reasoning = get_category_reasoning(request.category, analysis.best_card_reward,
-                                            analysis.current_card_reward.applicable_rate if analysis.current_card_reward else 0,
-                                            analysis.best_card_reward.applicable_rate)
-        elif analysis.extra_reward_amt > 0.15:  # Meaningful absolute savings
-            should_trigger = True
-            confidence = 0.8
-            reasoning = f"Worth considering: ${analysis.extra_reward_amt:.2f} more in rewards for {request.category}"
-        elif request.amount > 100 and analysis.reward_gap_pct > 50 and analysis.extra_reward_amt > 0.10:
-            should_trigger = True
-            confidence = 0.7
-            reasoning = get_category_reasoning(request.category, analysis.best_card_reward,
-                                            analysis.current_card_reward.applicable_rate if analysis.current_card_reward else 0,
-                                            analysis.best_card_reward.applicable_rate)
-        elif analysis.reward_gap_pct > 75 and analysis.extra_reward_amt > 0.05 and request.amount > 30:
-            should_trigger = True
-            confidence = 0.65
-            reasoning = get_category_reasoning(request.category, analysis.best_card_reward,
-                                            analysis.current_card_reward.applicable_rate if analysis.current_card_reward else 0,
-                                            analysis.best_card_reward.applicable_rate)
+        # Business rules for triggering, first match wins
+        reward_gap_pct = analysis.reward_gap_pct
+        extra_reward_amt = analysis.extra_reward_amt
+        for min_gap, min_extra, min_amount, rule_confidence, category_reasoning in TRIGGER_RULES:
+            if reward_gap_pct > min_gap and extra_reward_amt > min_extra and request.amount > min_amount:
+                should_trigger = True
+                confidence = rule_confidence(reward_gap_pct)
+                if category_reasoning:
+                    best_card = analysis.best_card_reward
+                    current_rate = analysis.current_card_reward.applicable_rate if analysis.current_card_reward else 0
+                    reasoning = get_category_reasoning(request.category, best_card, current_rate, best_card.applicable_rate)
+                else:
+                    reasoning = f"Worth considering: ${extra_reward_amt:.2f} more in rewards for {request.category}"
+                break
         
         # Update cooldown if recommending
         if should_trigger:
-            update_user_cooldown(request.user_id)
+            await update_user_cooldown(request.user_id)
         
-        return TriggerResponse(
+        return TriggerResponse.model_construct(
             recommend_flag=should_trigger,
             confidence_score=confidence,
             suggested_card_id=analysis.best_card_reward.card_id,
@@ -330,7 +691,7 @@ def trigger_classify(request: TransactionRequest) -> TriggerResponse:
         raise HTTPException(status_code=500, detail=f"Classification error: {str(e)}")
 
 @app.post("/personalized-ranking")
-def personalized_ranking(request: RankingRequest) -> RankingResponse:
+async def personalized_ranking(request: RankingRequest) -> RankingResponse:
     """
     Get personalized card ranking for homepage display.
     Returns ranked list of card recommendations based on actual spending patterns.
@@ -342,8 +703,8 @@ def personalized_ranking(request: RankingRequest) -> RankingResponse:
     
     try:
         # Load card catalog
-        cards = load_card_catalog()
-        if not cards:
+        catalog = await asyncio.to_thread(load_card_catalog_arrays)
+        if catalog is None:
             raise HTTPException(status_code=503, detail="Card catalog not available")
         
         # Enhanced ranking logic based on real spending patterns
@@ -352,126 +713,35 @@ def personalized_ranking(request: RankingRequest) -> RankingResponse:
         
         # If no spending pattern provided, use default pattern
         if not spending_pattern:
-            spending_pattern = {
-                "dining": 600,
-                "groceries": 400, 
-                "gas": 200,
-                "travel": 150,
-                "other": 1650
-            }
+            spending_pattern = DEFAULT_SPENDING_PATTERN
         
-        ranked_cards = []
-        for card in cards:
-            # Skip cards user already has
-            if card["card_id"] in user_cards:
-                continue
-            
-            # Calculate expected annual rewards based on spending pattern
-            annual_reward = 0
-            category_breakdown = {}
-            
-            # Get bonus categories (parse JSON if string)
-            bonus_categories = card.get("bonus_categories", {})
-            if isinstance(bonus_categories, str):
-                try:
-                    import json
-                    bonus_categories = json.loads(bonus_categories)
-                except:
-                    bonus_categories = {}
-            
-            base_rate = float(card.get("base_rate_pct", 1.0))
-            
-            # Calculate rewards for each spending category
-            for category, monthly_amount in spending_pattern.items():
-                # Get reward rate for this category
-                if category in bonus_categories:
-                    rate = float(bonus_categories[category])
-                else:
-                    rate = base_rate
-                
-                # Calculate annual reward
-                if card["reward_type"] == "cashback":
-                    # Cashback is simple percentage
-                    category_reward = monthly_amount * 12 * (rate / 100)
-                else:
-                    # Points/miles need value conversion
-                    points = monthly_amount * 12 * rate
-                    point_value = float(card.get("point_value_cent", 1.0)) / 100
-                    category_reward = points * point_value
-                
-                annual_reward += category_reward
-                category_breakdown[category] = category_reward
-            
-            # Subtract annual fee
-            annual_fee = float(card.get("annual_fee", 0))
-            net_benefit = annual_reward - annual_fee
-            
-            # Calculate composite score
-            total_spending = sum(spending_pattern.values()) * 12
-            
-            # Base score from net benefit (normalized)
-            benefit_score = min(net_benefit / 1000, 1.0) * 0.5
-            
-            # Reward rate effectiveness
-            if total_spending > 0:
-                effectiveness = annual_reward / total_spending
-                effectiveness_score = min(effectiveness * 10, 1.0) * 0.3
-            else:
-                effectiveness_score = 0
-            
-            # Annual fee penalty (less penalty for high spenders)
-            if total_spending > 36000:  # $3k/month
-                fee_penalty = min(annual_fee / 1000, 0.1)
-            else:
-                fee_penalty = min(annual_fee / 500, 0.2)
-            
-            # Signup bonus contribution (amortized over 2 years)
-            signup_bonus = float(card.get("signup_bonus_value", 0))
-            bonus_score = min(signup_bonus / 2000, 0.2)
-            
-            # Calculate final score
-            score = benefit_score + effectiveness_score + bonus_score - fee_penalty
-            score = max(0.1, min(1.0, score))
-            
-            # Generate recommendation reason
-            if net_benefit <= 0:
-                reason = "Consider if you value the card's additional benefits"
-            else:
-                # Find top rewarding categories
-                top_categories = sorted(category_breakdown.items(), key=lambda x: x[1], reverse=True)[:2]
-                if top_categories:
-                    top_cat = top_categories[0][0].replace("_", " ").title()
-                    reason = f"Excellent rewards for your {top_cat} spending"
-                else:
-                    reason = f"Estimated annual benefit: ${net_benefit:.0f}"
-            
-            ranked_cards.append({
-                "card_id": card["card_id"],
-                "issuer": card.get("issuer", "Unknown"),
-                "card_name": card.get("card_id", "").replace("_", " ").title(),
-                "ranking_score": score,
-                "annual_fee": annual_fee,
-                "signup_bonus": signup_bonus,
-                "reason": reason
-            })
-        
-        # Sort by ranking score
-        ranked_cards.sort(key=lambda x: x["ranking_score"], reverse=True)
-        
-        # Return top 5
-        top_cards = ranked_cards[:5]
-        
-        return RankingResponse(
+        # Rankings are deterministic for a given catalog, so recent ones are reused
+        cache_key = _rank_cache_key(request.user_id, user_cards, spending_pattern)
+        cached = rank_cache.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic() and cached[1] is catalog:
+            rank_cache.move_to_end(cache_key)
+            return cached[2]
+        
+        top_cards = await asyncio.to_thread(_rank_cards, catalog, spending_pattern, user_cards)
+        
+        response = RankingResponse.model_construct(
             ranked_cards=top_cards,
             user_id=request.user_id,
             ranking_score=sum(card["ranking_score"] for card in top_cards) / len(top_cards) if top_cards else 0.0
         )
         
+        rank_cache[cache_key] = (time.monotonic() + RANK_CACHE_TTL_SECONDS, catalog, response)
+        rank_cache.move_to_end(cache_key)
+        if len(rank_cache) > RANK_CACHE_MAX_ENTRIES:
+            rank_cache.popitem(last=False)
+        
+        return response
+        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ranking error: {str(e)}")
 
 @app.post("/estimate-rewards")
-def estimate_rewards(request: RewardEstimationRequest) -> RewardEstimationResponse:
+async def estimate_rewards(request: RewardEstimationRequest) -> RewardEstimationResponse:
     """
     Estimate potential rewards for a specific card given spending pattern.
     """
@@ -481,15 +751,12 @@ def estimate_rewards(request: RewardEstimationRequest) -> RewardEstimationRespon
     
     try:
         # Load card catalog to get card details
-        cards = load_card_catalog()
-        target_card = None
-        for card in cards:
-            if card["card_id"] == request.card_id:
-                target_card = card
-                break
+        cards, catalog = await asyncio.to_thread(_card_catalog)
+        row = catalog.index.get(request.card_id) if catalog else None
         
-        if not target_card:
+        if row is None:
             raise HTTPException(status_code=404, detail="Card not found")
+        target_card = cards[row]
         
         # Calculate rewards for each category
         category_rewards = {}
@@ -500,7 +767,7 @@ def estimate_rewards(request: RewardEstimationRequest) -> RewardEstimationRespon
                 continue
             
             # Mock reward calculation (simplified)
-            base_rate = float(target_card.get("base_rate_pct", 1.0)) / 100
+            base_rate = target_card.base_rate / 100
             
             # Apply category bonuses (mock)
             category_multiplier = 1.0
@@ -517,7 +784,7 @@ def estimate_rewards(request: RewardEstimationRequest) -> RewardEstimationRespon
         months = request.time_horizon_months or 12
         annual_reward = total_estimated_reward * (12 / months)
         
-        return RewardEstimationResponse(
+        return RewardEstimationResponse.model_construct(
             estimated_annual_reward=annual_reward,
             category_breakdown=category_rewards,
             compared_to_current=None  # Could compare to current portfolio
@@ -527,24 +794,22 @@ def estimate_rewards(request: RewardEstimationRequest) -> RewardEstimationRespon
         raise HTTPException(status_code=500, detail=f"Estimation error: {str(e)}")
 
 @app.post("/optimize-portfolio")
-def optimize_portfolio(request: PortfolioOptimizationRequest) -> PortfolioOptimizationResponse:
+async def optimize_portfolio(request: PortfolioOptimizationRequest) -> PortfolioOptimizationResponse:
     """
     Analyze current card portfolio and suggest optimizations.
     """
     
     try:
         # Load card catalog
-        cards = load_card_catalog()
-        if not cards:
+        catalog = await asyncio.to_thread(load_card_catalog_arrays)
+        if catalog is None:
             raise HTTPException(status_code=503, detail="Card catalog not available")
         
         # Calculate current portfolio performance
-        current_cards = []
-        for card in cards:
-            if card["card_id"] in request.current_cards:
-                current_cards.append(card)
+        current_set = frozenset(request.current_cards)
+        owned = np.isin(catalog.card_ids, list(current_set))
         
-        if not current_cards:
+        if not owned.any():
             raise HTTPException(status_code=400, detail="No valid current cards found")
         
         # Mock portfolio analysis
@@ -552,7 +817,7 @@ def optimize_portfolio(request: PortfolioOptimizationRequest) -> PortfolioOptimi
         total_spending = sum(request.spending_pattern.values())
         
         # Calculate current portfolio efficiency
-        total_fees = sum(float(card.get("annual_fee", 0)) for card in current_cards)
+        total_fees = float(catalog.annual_fee[owned].sum())
         fee_burden = total_fees / total_spending if total_spending > 0 else 0
         current_score -= min(fee_burden * 0.5, 0.3)
         
@@ -560,35 +825,35 @@ def optimize_portfolio(request: PortfolioOptimizationRequest) -> PortfolioOptimi
         recommendations = []
         
         # If portfolio is small, suggest adding cards
-        if len(current_cards) < 3:
-            available_cards = [card for card in cards if card["card_id"] not in request.current_cards]
-            for card in available_cards[:2]:
+        if owned.sum() < 3:
+            for idx in np.flatnonzero(~owned)[:2]:
+                card = catalog.records[idx]
                 recommendations.append({
                     "action": "add",
-                    "card_id": card["card_id"],
-                    "card_name": card.get("card_id", "").replace("_", " ").title(),
+                    "card_id": card.card_id,
+                    "card_name": card.card_id.replace("_", " ").title(),
                     "reasoning": "Diversify your portfolio with specialized rewards",
                     "impact_score": 0.15,
-                    "annual_fee": float(card.get("annual_fee", 0))
+                    "annual_fee": card.annual_fee
                 })
         
         # If high-fee cards with low utilization, suggest switches
         if total_fees > total_spending * 0.02:  # Fees > 2% of spending
-            high_fee_cards = [card for card in current_cards if float(card.get("annual_fee", 0)) > 200]
-            if high_fee_cards:
+            high_fee_cards = np.flatnonzero(owned & (catalog.annual_fee > 200))
+            if high_fee_cards.size:
                 recommendations.append({
                     "action": "switch",
-                    "card_id": high_fee_cards[0]["card_id"],
+                    "card_id": catalog.card_ids[high_fee_cards[0]],
                     "reasoning": "Consider switching from high-fee card due to spending pattern",
                     "impact_score": 0.20,
-                    "annual_fee_savings": float(high_fee_cards[0].get("annual_fee", 0))
+                    "annual_fee_savings": float(catalog.annual_fee[high_fee_cards[0]])
                 })
         
         # Calculate optimized score
         optimized_score = current_score + sum(rec.get("impact_score", 0) for rec in recommendations)
         optimized_score = min(optimized_score, 1.0)
         
-        return PortfolioOptimizationResponse(
+        return PortfolioOptimizationResponse.model_construct(
             recommendations=recommendations,
             current_portfolio_score=current_score,
             optimized_portfolio_score=optimized_score
@@ -598,32 +863,76 @@ def optimize_portfolio(request: PortfolioOptimizationRequest) -> PortfolioOptimi
         raise HTTPException(status_code=500, detail=f"Optimization error: {str(e)}")
 
 # Application lifecycle
-def startup():
+def startup(model_data: Optional[Dict[str, Any]] = None):
     """Initialize the application."""
     print("🚀 Starting RecEngine API...")
     
     # Load models
-    models_loaded = load_models()
+    models_loaded = load_models(model_data)
     if not models_loaded:
         print("⚠️ Warning: Some models failed to load")
     
+    # Parse the catalog and run one ranking so the first request doesn't pay for it
+    catalog = load_card_catalog_arrays()
+    if catalog is not None:
+        _rank_cards(catalog, DEFAULT_SPENDING_PATTERN, [])
+    
     print(f"✅ RecEngine API ready! Loaded {len(models)} models")
 
 def shutdown():
     """Clean up on shutdown."""
     print("🛑 Shutting down RecEngine API...")
 
-# Mock server runner
-def run_server(host="0.0.0.0", port=8000):
-    """Mock server runner for testing."""
-    startup()
+def available_cpus() -> int:
+    """CPUs this process may run on: its affinity mask, capped by a cgroup CPU quota.
+    
+    In a container os.cpu_count() is the host's count, not the container's limit.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        cpus = os.cpu_count() or 1
+    
+    # cgroup v2 ("<quota> <period>" or "max <period>"), then cgroup v1
+    cgroup_quota_files = (
+        ("/sys/fs/cgroup/cpu.max",),
+        ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us"),
+    )
+    for quota_files in cgroup_quota_files:
+        try:
+            quota, period = " ".join(Path(path).read_text() for path in quota_files).split()[:2]
+        except (OSError, ValueError):
+            continue
+        if quota not in ("max", "-1"):
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+        break
+    
+    return cpus
+
+# Server runner
+def run_server(host="0.0.0.0", port=8000, workers: Optional[int] = None):
+    """Run the API with uvicorn (uvloop + httptools, one process per available CPU by default)."""
+    import uvicorn
     
-    print(f"📡 RecEngine API running on http://{host}:{port}")
+    if workers is None:
+        workers = int(os.getenv("WEB_CONCURRENCY", available_cpus()))
+    
+    print(f"📡 RecEngine API running on http://{host}:{port} ({workers} workers)")
     print(f"📚 API documentation: http://{host}:{port}/docs")
     print(f"🔧 Health check: http://{host}:{port}/health")
     
-    # In real implementation, would use uvicorn.run(app, host=host, port=port)
-    print("Note: This is a mock server. Use 'uvicorn src.api:app --reload' for real deployment.")
+    # Workers import the app by name; each one runs startup() on its own
+    uvicorn.run(
+        "src.api:app",
+        app_dir=str(Path(__file__).parent.parent),
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False,
+    )
 
 if __name__ == "__main__":
     run_server()
\ No newline at end of file
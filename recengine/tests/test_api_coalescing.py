@@ -0,0 +1,83 @@
+"""
+Unit tests for coalescing identical concurrent reward analyses in the API.
+"""
+
+import asyncio
+from pathlib import Path
+import sys
+import threading
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+import api
+
+
+class BlockingCalculator:
+    """Reward calculator stand-in that blocks until released and counts calls."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def analyze_transaction(self, amount, category, current_card_id):
+        self.calls.append((amount, category, current_card_id))
+        self.release.wait(timeout=5)
+        return {"amount": amount, "category": category}
+
+
+async def wait_for_calls(calculator, count):
+    """Yield to the event loop until the worker threads have started."""
+    for _ in range(500):
+        if len(calculator.calls) >= count:
+            return
+        await asyncio.sleep(0.01)
+
+
+class TestAnalysisCoalescing:
+    """Test suite for analyze_transaction_coalesced."""
+
+    def test_identical_requests_share_one_run(self, monkeypatch):
+        """Test that identical concurrent requests run the analysis once."""
+        calculator = BlockingCalculator()
+        monkeypatch.setattr(api, "reward_calculator", calculator)
+
+        async def scenario():
+            first = asyncio.ensure_future(api.analyze_transaction_coalesced(50.0, "dining", "card_a"))
+            second = asyncio.ensure_future(api.analyze_transaction_coalesced(50.0, "dining", "card_a"))
+            other = asyncio.ensure_future(api.analyze_transaction_coalesced(75.0, "dining", "card_a"))
+            await wait_for_calls(calculator, 2)
+            calculator.release.set()
+            return await asyncio.gather(first, second, other)
+
+        first, second, other = asyncio.run(scenario())
+
+        assert first is second, "Identical requests should share the same result"
+        assert other["amount"] == 75.0
+        assert len(calculator.calls) == 2, "Only distinct requests should reach the calculator"
+        assert not api.analysis_inflight, "Finished analyses should leave the in-flight table"
+
+    def test_cancelled_leader_does_not_fail_followers(self, monkeypatch):
+        """Test that cancelling the first request still delivers the shared result."""
+        calculator = BlockingCalculator()
+        monkeypatch.setattr(api, "reward_calculator", calculator)
+
+        async def scenario():
+            leader = asyncio.ensure_future(api.analyze_transaction_coalesced(50.0, "dining", "card_a"))
+            await wait_for_calls(calculator, 1)
+            follower = asyncio.ensure_future(api.analyze_transaction_coalesced(50.0, "dining", "card_a"))
+            await asyncio.sleep(0)
+
+            leader.cancel()
+            await asyncio.sleep(0)
+            calculator.release.set()
+
+            result = await follower
+            return leader, result
+
+        leader, result = asyncio.run(scenario())
+
+        assert leader.cancelled(), "Cancellation should still reach the leader"
+        assert result == {"amount": 50.0, "category": "dining"}
+        assert len(calculator.calls) == 1
+        assert not api.analysis_inflight
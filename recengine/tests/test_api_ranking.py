@@ -0,0 +1,148 @@
+"""
+Unit tests for personalized ranking in the API.
+"""
+
+import asyncio
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+import api
+
+
+def make_card(card_id: str, annual_fee: float = 95.0, dining_rate: float = 3.0) -> api.CardRecord:
+    return api.CardRecord(
+        card_id=card_id,
+        issuer="Test Bank",
+        base_rate=1.0,
+        annual_fee=annual_fee,
+        signup_bonus=200.0,
+        bonus_categories={"dining": dining_rate},
+        reward_type="cashback",
+        point_value_cent=1.0,
+        is_cashback=True,
+    )
+
+
+def sorted_top_k(scores: np.ndarray, candidates: np.ndarray, k: int) -> list:
+    """Reference ranking: the previous full stable sort of every candidate."""
+    return sorted(candidates.tolist(), key=lambda idx: scores[idx], reverse=True)[:k]
+
+
+class TestTopKIndices:
+    """Test suite for top_k_indices."""
+
+    def test_matches_full_sort_with_ties(self):
+        """Test that the partitioned top-k has the same order as a full sort, ties included."""
+        rng = np.random.default_rng(3)
+        for _ in range(200):
+            n = int(rng.integers(1, 40))
+            # Few distinct values so ties, also at the k-th place, are common
+            scores = rng.integers(0, 4, n).astype(np.float64)
+            candidates = np.flatnonzero(rng.random(n) < 0.8)
+            for k in (1, 5, n + 1):
+                assert api.top_k_indices(scores, candidates, k).tolist() == sorted_top_k(scores, candidates, k)
+
+    def test_all_tied_keeps_catalog_order(self):
+        """Test that when every card scores the same the earliest candidates win."""
+        scores = np.full(10, 0.1)
+        candidates = np.array([1, 2, 4, 5, 6, 8, 9])
+
+        assert api.top_k_indices(scores, candidates, 5).tolist() == [1, 2, 4, 5, 6]
+
+    def test_no_candidates(self):
+        """Test that an empty candidate set gives an empty ranking."""
+        assert len(api.top_k_indices(np.ones(3), np.array([], dtype=np.int64), 5)) == 0
+
+    def test_rank_cards_ties_follow_catalog_order(self):
+        """Test that identical cards are ranked in catalog order, skipping owned ones."""
+        catalog = api.build_card_catalog_arrays([make_card(f"card_{i}") for i in range(8)])
+
+        top_cards = api._rank_cards(catalog, {"dining": 500.0}, ["card_1"])
+
+        assert [card["card_id"] for card in top_cards] == ["card_0", "card_2", "card_3", "card_4", "card_5"]
+
+
+class RankingHarness:
+    """Drives /personalized-ranking with a fake clock, catalog and ranking counter."""
+
+    def __init__(self, monkeypatch):
+        self.now = 1000.0
+        self.calls = 0
+        self.catalog = api.build_card_catalog_arrays([make_card(f"card_{i}") for i in range(8)])
+
+        rank_cards = api._rank_cards
+
+        def counting_rank_cards(*args):
+            self.calls += 1
+            return rank_cards(*args)
+
+        monkeypatch.setitem(api.models, "card_ranker", {"type": "test"})
+        monkeypatch.setattr(api, "rank_cache", OrderedDict())
+        monkeypatch.setattr(api, "load_card_catalog_arrays", lambda: self.catalog)
+        monkeypatch.setattr(api, "_rank_cards", counting_rank_cards)
+        monkeypatch.setattr(api, "time", SimpleNamespace(monotonic=lambda: self.now, time=lambda: self.now))
+
+    def rank(self, user_id: str = "user_a"):
+        request = api.RankingRequest(user_id=user_id, user_cards=["card_1"], spending_pattern={"dining": 500.0})
+        return asyncio.run(api.personalized_ranking(request))
+
+
+class TestRankCache:
+    """Test suite for the /personalized-ranking response cache."""
+
+    def test_repeat_request_is_served_from_cache(self, monkeypatch):
+        """Test that an identical request within the TTL reuses the response."""
+        harness = RankingHarness(monkeypatch)
+
+        first = harness.rank()
+        harness.now += api.RANK_CACHE_TTL_SECONDS - 1
+        second = harness.rank()
+
+        assert second is first
+        assert harness.calls == 1
+
+    def test_entry_expires_after_ttl(self, monkeypatch):
+        """Test that a request after the TTL is ranked again."""
+        harness = RankingHarness(monkeypatch)
+
+        first = harness.rank()
+        harness.now += api.RANK_CACHE_TTL_SECONDS + 1
+        second = harness.rank()
+
+        assert second is not first
+        assert harness.calls == 2
+
+    def test_least_recently_used_entry_is_evicted(self, monkeypatch):
+        """Test that the cache drops the least recently used entry when full."""
+        harness = RankingHarness(monkeypatch)
+        monkeypatch.setattr(api, "RANK_CACHE_MAX_ENTRIES", 2)
+
+        harness.rank("user_a")
+        harness.rank("user_b")
+        harness.rank("user_a")  # hit, user_a becomes most recent
+        harness.rank("user_c")  # evicts user_b
+        assert harness.calls == 3
+        assert len(api.rank_cache) == 2
+
+        harness.rank("user_a")
+        assert harness.calls == 3, "user_a should still be cached"
+        harness.rank("user_b")
+        assert harness.calls == 4, "user_b should have been evicted"
+
+    def test_catalog_reload_invalidates_entries(self, monkeypatch):
+        """Test that a reloaded catalog is not served rankings from the old one."""
+        harness = RankingHarness(monkeypatch)
+
+        first = harness.rank()
+        harness.catalog = api.build_card_catalog_arrays([make_card(f"card_{i}") for i in range(8)])
+        second = harness.rank()
+
+        assert second is not first
+        assert harness.calls == 2
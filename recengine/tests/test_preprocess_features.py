@@ -0,0 +1,174 @@
+"""
+Unit tests for incremental feature preprocessing (90-day user stats,
+appended-transaction loading and category totals).
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add scripts to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+
+import preprocess_features
+from preprocess_features import (
+    compute_category_totals, compute_daily_partials, compute_user_stats_90d, load_transactions,
+    merge_category_totals, merge_daily_partials, stats_window_cutoff, to_epoch_seconds
+)
+
+CURRENT_TIME = datetime(2024, 6, 1, 15, 30, 45, 250000)
+NUMERIC_COLUMNS = [
+    "user_avg_amount", "user_std_amount", "user_transaction_count", "user_total_spending",
+    "user_days_since_last_txn", "user_avg_txn_per_day", "user_unique_categories",
+    "user_max_amount", "user_min_amount",
+]
+
+
+def make_transactions(timestamps, user_ids, amounts, categories) -> pd.DataFrame:
+    """Build a transactions frame shaped like load_transactions()."""
+    return pd.DataFrame({
+        "user_id": pd.Categorical(user_ids),
+        "card_id": pd.Categorical(["card_0"] * len(user_ids)),
+        "amount": np.asarray(amounts, dtype=np.float64),
+        "category": pd.Categorical(categories),
+        "timestamp": np.asarray(timestamps, dtype=np.int64),
+    })
+
+
+def random_transactions(n: int = 5000, seed: int = 7) -> pd.DataFrame:
+    """Random transactions spanning 100 days before CURRENT_TIME."""
+    rng = np.random.default_rng(seed)
+    end = int(to_epoch_seconds(CURRENT_TIME))
+    return make_transactions(
+        rng.integers(end - 100 * 86400, end, n),
+        rng.choice([f"user_{i}" for i in range(50)], n),
+        rng.uniform(1, 500, n).round(2),
+        rng.choice(["dining", "groceries", "gas", "travel", "other"], n),
+    )
+
+
+def stats_by_user(stats: pd.DataFrame) -> pd.DataFrame:
+    return stats.set_index("user_id").sort_index()[NUMERIC_COLUMNS]
+
+
+class TestUserStats90d:
+    """Test suite for compute_user_stats_90d."""
+
+    def test_incremental_merge_matches_full_run(self):
+        """Test that merged daily partials give the same stats as one full pass."""
+        transactions = random_transactions()
+        split = int(np.quantile(transactions["timestamp"], 0.6))
+        old = transactions[transactions["timestamp"] <= split]
+        new = transactions[transactions["timestamp"] > split]
+
+        full = compute_user_stats_90d(
+            compute_daily_partials(transactions), transactions, current_time=CURRENT_TIME
+        )
+        merged = merge_daily_partials(compute_daily_partials(old), compute_daily_partials(new))
+        incremental = compute_user_stats_90d(merged, transactions, current_time=CURRENT_TIME)
+
+        full, incremental = stats_by_user(full), stats_by_user(incremental)
+        assert list(full.index) == list(incremental.index)
+        np.testing.assert_allclose(incremental.to_numpy(), full.to_numpy(), rtol=0, atol=1e-9)
+
+    def test_window_starts_exactly_90_days_ago(self):
+        """Test that the window boundary is now - 90 days, not the start of that day."""
+        cutoff = stats_window_cutoff(CURRENT_TIME)
+        boundary_day = cutoff - cutoff % 86400
+        transactions = make_transactions(
+            [boundary_day, cutoff - 1, cutoff, cutoff + 3600, int(to_epoch_seconds(CURRENT_TIME)) - 60],
+            ["user_a"] * 5,
+            [1000.0, 100.0, 10.0, 1.0, 0.5],
+            ["dining", "travel", "gas", "groceries", "other"],
+        )
+
+        stats = compute_user_stats_90d(
+            compute_daily_partials(transactions), transactions, current_time=CURRENT_TIME
+        ).set_index("user_id")
+
+        user = stats.loc["user_a"]
+        assert user["user_transaction_count"] == 3, "Only transactions at or after the cutoff count"
+        assert user["user_total_spending"] == 11.5
+        assert user["user_max_amount"] == 10.0
+        assert user["user_unique_categories"] == 3
+
+    def test_window_matches_raw_filter(self):
+        """Test that windowed stats equal a direct filter of the raw transactions."""
+        transactions = random_transactions(seed=11)
+        stats = stats_by_user(compute_user_stats_90d(
+            compute_daily_partials(transactions), transactions, current_time=CURRENT_TIME
+        ))
+
+        recent = transactions[transactions["timestamp"] >= stats_window_cutoff(CURRENT_TIME)]
+        expected = recent.groupby("user_id", observed=True)["amount"].agg(["count", "sum"])
+        expected.index = expected.index.astype(str)
+        expected = expected.sort_index()
+
+        assert list(stats.index) == list(expected.index)
+        np.testing.assert_array_equal(stats["user_transaction_count"], expected["count"])
+        np.testing.assert_allclose(stats["user_total_spending"], expected["sum"], rtol=1e-12)
+
+
+CSV_HEADER = "transaction_id,user_id,card_id,amount,category,merchant,location,timestamp\n"
+
+
+def csv_row(txn_id: str, user_id: str, amount: float, timestamp: str) -> str:
+    return f"{txn_id},{user_id},card_0,{amount},dining,Merchant_1,CA,{timestamp}\n"
+
+
+class TestIncrementalLoading:
+    """Test suite for reading only the transactions appended since the last run."""
+
+    def test_offset_reads_only_appended_rows(self, tmp_path, monkeypatch):
+        """Test that rows past the offset are read whatever their timestamps."""
+        path = tmp_path / "transactions.csv"
+        monkeypatch.setattr(preprocess_features, "TRANSACTIONS_FILE", path)
+        path.write_text(CSV_HEADER + csv_row("t1", "user_a", 10.0, "2024-05-01T12:00:00"))
+
+        first, offset = load_transactions()
+        assert list(first["transaction_id"]) == ["t1"]
+        assert offset == path.stat().st_size
+
+        # Same second as the last row, and a late row for another user
+        with open(path, "a") as f:
+            f.write(csv_row("t2", "user_b", 20.0, "2024-05-01T12:00:00"))
+            f.write(csv_row("t3", "user_c", 30.0, "2024-04-20T08:00:00"))
+
+        delta, next_offset = load_transactions(offset)
+        assert list(delta["transaction_id"]) == ["t2", "t3"]
+        assert next_offset == path.stat().st_size
+
+    def test_duplicates_and_partial_lines(self, tmp_path, monkeypatch):
+        """Test that repeated transaction_ids are dropped and a partial line is deferred."""
+        path = tmp_path / "transactions.csv"
+        monkeypatch.setattr(preprocess_features, "TRANSACTIONS_FILE", path)
+        complete = CSV_HEADER + csv_row("t1", "user_a", 10.0, "2024-05-01T12:00:00")
+        path.write_text(complete + csv_row("t1", "user_a", 10.0, "2024-05-01T12:00:00") + "t2,user_b,ca")
+
+        transactions, offset = load_transactions()
+
+        assert list(transactions["transaction_id"]) == ["t1"]
+        assert offset == len(complete) + len(csv_row("t1", "user_a", 10.0, "2024-05-01T12:00:00"))
+
+        empty, same_offset = load_transactions(offset)
+        assert empty.empty and same_offset == offset
+
+
+class TestCategoryTotals:
+    """Test suite for the running per-category totals."""
+
+    def test_merged_totals_match_full_run(self):
+        """Test that merging totals of two batches equals totals of all rows."""
+        transactions = random_transactions(n=2000, seed=3)
+        full = compute_category_totals(transactions)
+        merged = merge_category_totals(
+            compute_category_totals(transactions.iloc[:700]), compute_category_totals(transactions.iloc[700:])
+        )
+
+        assert sorted(merged) == sorted(full)
+        for category, (total, count) in full.items():
+            assert merged[category][1] == count
+            assert np.isclose(merged[category][0], total, rtol=1e-12)
@@ -0,0 +1,56 @@
+"""
+Unit tests for the per-trial gap filter in hyperparameter tuning.
+"""
+
+from pathlib import Path
+import sys
+
+import numpy as np
+
+# Add training to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "training"))
+
+from tune_hyperparams import gap_filter_start, gap_sort_key
+
+
+def filter_by_gap(reward_gap: np.ndarray, labels: np.ndarray, gap_thr: float) -> np.ndarray:
+    """Reference boolean mask: negatives plus positives whose gap clears the threshold."""
+    return (reward_gap >= gap_thr * 100) | (labels == 0)
+
+
+class TestGapFilter:
+    """Test suite for gap_sort_key and gap_filter_start."""
+
+    def make_rows(self, seed: int = 5):
+        rng = np.random.default_rng(seed)
+        n = 2000
+        # Gaps on a coarse grid so many rows tie exactly at the thresholds
+        reward_gap = (rng.integers(0, 60, n) / 10).astype(np.float32)
+        reward_gap[rng.choice(n, 100, replace=False)] = np.nan
+        labels = rng.integers(0, 2, n).astype(np.int8)
+        return reward_gap, labels
+
+    def test_tail_matches_mask(self):
+        """Test that the sorted tail keeps exactly the rows the boolean mask keeps."""
+        reward_gap, labels = self.make_rows()
+        gap_key = gap_sort_key(reward_gap, labels)
+        order = np.argsort(gap_key, kind="stable")
+        gap_key = gap_key[order]
+
+        # Thresholds on the grid (ties), between grid points and past every gap
+        thresholds = [0.0, 0.005, 0.01, 0.0123, 0.02, 0.025, 0.05, 0.1]
+        for gap_thr in thresholds:
+            start = gap_filter_start(gap_key, gap_thr)
+            expected = np.flatnonzero(filter_by_gap(reward_gap, labels, gap_thr))
+            np.testing.assert_array_equal(np.sort(order[start:]), expected, err_msg=f"gap_thr={gap_thr}")
+
+    def test_nan_gap_positives_are_dropped(self):
+        """Test that positives with a NaN gap are dropped and negatives are kept."""
+        reward_gap = np.array([np.nan, np.nan, 1.0, 3.0], dtype=np.float32)
+        labels = np.array([1, 0, 1, 1], dtype=np.int8)
+        gap_key = gap_sort_key(reward_gap, labels)
+        order = np.argsort(gap_key, kind="stable")
+
+        start = gap_filter_start(gap_key[order], 0.01)
+
+        assert sorted(order[start:]) == [1, 2, 3]
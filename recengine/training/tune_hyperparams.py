@@ -6,11 +6,24 @@ Jointly tunes gap_thr, learning_rate, max_depth across trigger and ranker models
 
 import argparse
 import csv
+import heapq
 import json
+import os
 import sys
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Dict, List, Tuple
 import warnings
+
+import lightgbm as lgb
+import numpy as np
+import optuna
+from optuna.integration import LightGBMPruningCallback
+
+try:
+    import cmaes  # backs optuna's CmaEsSampler
+except ImportError:
+    cmaes = None
 warnings.filterwarnings('ignore')
 
 # Add src to path for imports
@@ -19,99 +32,204 @@ sys.path.append(str(Path(__file__).parent.parent / "src"))
 # Import our training modules
 from train_trigger import (
     load_labeled_data, extract_features, train_trigger_classifier, 
-    evaluate_model, train_test_split, roc_auc_score
+    roc_auc_score, CORE_FEATURES
 )
 from train_ranker import (
     load_card_catalog, load_user_data, generate_ranking_training_data,
     train_ranker_model, evaluate_ranker, train_test_split_groups
 )
 
-# Mock Optuna for development
-class OptunaStudy:
-    """Mock Optuna study for hyperparameter optimization."""
-    
-    def __init__(self, direction="maximize"):
-        self.direction = direction
-        self.trials = []
-        self.best_params = None
-        self.best_value = float('-inf') if direction == "maximize" else float('inf')
-        
-    def optimize(self, objective_func, n_trials=20):
-        """Run optimization trials."""
-        import random
-        random.seed(42)
-        
-        print(f"🔍 Starting Optuna optimization with {n_trials} trials...")
-        
-        for trial_idx in range(n_trials):
-            # Create mock trial
-            trial = MockTrial(trial_idx)
-            
-            try:
-                # Run objective function
-                value = objective_func(trial)
-                
-                # Track trial
-                self.trials.append({
-                    "number": trial_idx,
-                    "value": value,
-                    "params": trial.params.copy()
-                })
-                
-                # Update best
-                if ((self.direction == "maximize" and value > self.best_value) or
-                    (self.direction == "minimize" and value < self.best_value)):
-                    self.best_value = value
-                    self.best_params = trial.params.copy()
-                
-                print(f"Trial {trial_idx:2d}: {value:.4f} | params: {trial.params}")
-                
-            except Exception as e:
-                print(f"Trial {trial_idx:2d}: FAILED - {e}")
-        
-        print(f"\n🎯 Best value: {self.best_value:.4f}")
-        print(f"🎯 Best params: {self.best_params}")
+# Configuration
+DATA_DIR = Path(__file__).parent.parent / "data"
+MODELS_DIR = Path(__file__).parent.parent / "models"
+TRIGGER_LABELS_FILE = "trigger_labels_v2.csv"
+GAP_IDX = CORE_FEATURES.index("reward_gap_pct")
+GPU_MAX_BIN = 63
+RANKER_MAX_BIN = 63
 
+# Failures that mean "this parameter region is degenerate" and score 0.0;
+# anything else prunes the trial so the sampler does not learn a fake score
+TRIAL_ERRORS = (ValueError, lgb.basic.LightGBMError)
 
-class MockTrial:
-    """Mock Optuna trial for parameter suggestions."""
-    
-    def __init__(self, trial_number):
-        self.number = trial_number
-        self.params = {}
-        import random
-        self.random = random.Random(42 + trial_number)
-    
-    def suggest_float(self, name, low, high):
-        """Suggest float parameter."""
-        value = self.random.uniform(low, high)
-        self.params[name] = value
-        return value
+
+def device_params(device: str) -> Dict:
+    """Extra LightGBM params for the requested training device."""
+    if device == "gpu":
+        # Smaller histograms are what make GPU training pay off
+        return {"device_type": "gpu", "max_bin": GPU_MAX_BIN}
+    return {}
+
+
+def booster_params(objective: str, learning_rate: float, max_depth: int, device: str, **extra) -> Dict:
+    """LightGBM training params shared by every tuning objective."""
+    return {
+        "objective": objective,
+        "learning_rate": learning_rate,
+        "max_depth": max_depth,
+        "seed": 42,
+        "num_threads": 1,  # trials run in parallel; avoid oversubscribing cores
+        "verbose": -1,
+        **device_params(device),
+        **extra
+    }
+
+
+@lru_cache(maxsize=None)
+def load_trigger_arrays() -> Tuple[np.ndarray, np.ndarray]:
+    """Load labeled data and extract features once, shared by every trial."""
+    labeled_data, labels = load_labeled_data(TRIGGER_LABELS_FILE)
     
-    def suggest_int(self, name, low, high):
-        """Suggest integer parameter."""
-        value = self.random.randint(low, high)
-        self.params[name] = value
-        return value
+    if not labeled_data:
+        return np.empty((0, len(CORE_FEATURES)), dtype=np.float32, order="F"), np.empty(0, dtype=np.int8)
     
-    def suggest_categorical(self, name, choices):
-        """Suggest categorical parameter."""
-        value = self.random.choice(choices)
-        self.params[name] = value
-        return value
+    # Column-major float32 so LightGBM bins each feature from contiguous memory
+    X_full = np.asfortranarray(extract_features(labeled_data), dtype=np.float32)
+    return X_full, np.asarray(labels, dtype=np.int8)
 
 
-# Configuration
-DATA_DIR = Path(__file__).parent.parent / "data"
-MODELS_DIR = Path(__file__).parent.parent / "models"
+def gap_sort_key(reward_gap: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Sort key that puts the rows any gap threshold keeps at the end.
+    
+    Negatives are always kept (inf); positives with a NaN gap never clear a
+    threshold, so they sort first (-inf).
+    """
+    gap_key = np.where(np.isnan(reward_gap), -np.inf, reward_gap)
+    return np.where(labels == 0, np.inf, gap_key).astype(np.float32)
+
+
+def gap_filter_start(gap_key: np.ndarray, gap_thr: float) -> int:
+    """First training row kept by the gap threshold.
+    
+    Training rows are ordered by ``gap_sort_key`` (positives by ascending
+    gap, then negatives), so keeping negatives plus positives whose reward
+    gap clears the threshold is always the tail from here.
+    """
+    return int(np.searchsorted(gap_key, np.float32(gap_thr * 100), side="left"))
+
+
+@lru_cache(maxsize=None)
+def load_ranking_inputs() -> Tuple[List[Dict], List[Dict]]:
+    """Load card catalog and users once, shared by every trial."""
+    return load_card_catalog(), load_user_data()
+
+
+def split_indices(n_rows: int, test_size: float, seed: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    """Deterministic train/test row indices from a single seeded permutation."""
+    perm = np.random.default_rng(seed).permutation(n_rows)
+    n_test = int(n_rows * test_size)
+    return perm[n_test:], perm[:n_test]
+
+
+def prepare_trigger_split(test_size: float = 0.2, max_rows: int = None, device: str = "cpu"):
+    """Split the cached trigger data once and bin it into shared LightGBM Datasets."""
+    X_full, labels_full = load_trigger_arrays()
+    
+    if not len(X_full):
+        return None
+    
+    X_full, labels_full = X_full[:max_rows], labels_full[:max_rows]
+    train_idx, test_idx = split_indices(len(X_full), test_size)
+    
+    # Sort training rows once so every gap threshold selects a contiguous tail
+    gap_key = gap_sort_key(X_full[train_idx, GAP_IDX], labels_full[train_idx])
+    order = np.argsort(gap_key, kind="stable")
+    train_idx, gap_key = train_idx[order], gap_key[order]
+    
+    params = {"verbose": -1, **device_params(device)}
+    dtrain = lgb.Dataset(
+        np.asfortranarray(X_full[train_idx]), labels_full[train_idx],
+        params=params, free_raw_data=False
+    ).construct()
+    dvalid = lgb.Dataset(
+        np.asfortranarray(X_full[test_idx]), labels_full[test_idx],
+        reference=dtrain, params=params, free_raw_data=False
+    ).construct()
+    return dtrain, dvalid, gap_key
+
+
+def prepare_ranker_split(
+    num_users: int = 50, samples_per_user: int = 8, test_size: float = 0.2, device: str = "cpu"
+):
+    """Generate and split the ranking data once and bin it into shared LightGBM Datasets."""
+    cards, users = load_ranking_inputs()
+    
+    if not cards or not users:
+        return None
+    
+    X, y, groups = generate_ranking_training_data(
+        users[:num_users], cards, num_samples_per_user=samples_per_user
+    )
+    
+    if not X:
+        return None
+    
+    X_train, X_test, y_train, y_test, groups_train, groups_test = train_test_split_groups(
+        X, y, groups, test_size=test_size, random_state=42
+    )
+    
+    # Same compact layout as the trigger data: float32 features, int8 relevance (0-3).
+    # feature_pre_filter is off so trials can vary min_data_in_leaf without
+    # LightGBM rebuilding the shared Dataset under other threads.
+    params = {
+        "verbose": -1,
+        "max_bin": RANKER_MAX_BIN,
+        "feature_pre_filter": False,
+        **device_params(device)
+    }
+    dtrain = lgb.Dataset(
+        np.asfortranarray(X_train, dtype=np.float32), np.asarray(y_train, dtype=np.int8),
+        group=groups_train, params=params, free_raw_data=False
+    ).construct()
+    dvalid = lgb.Dataset(
+        np.asfortranarray(X_test, dtype=np.float32), np.asarray(y_test, dtype=np.int8),
+        group=groups_test, reference=dtrain, params=params, free_raw_data=False
+    ).construct()
+    return dtrain, dvalid, groups_test
 
 
-def create_study(direction="maximize"):
-    """Create Optuna study (mock)."""
-    return OptunaStudy(direction=direction)
+def create_sampler(model: str) -> optuna.samplers.BaseSampler:
+    """Seeded sampler for the model being tuned.
+    
+    The combined objective is a small, mostly continuous space where CMA-ES
+    tends to converge in fewer trials; the others use TPE.
+    """
+    if model == "combined" and cmaes is not None:
+        return optuna.samplers.CmaEsSampler(seed=42, n_startup_trials=4)
+    return optuna.samplers.TPESampler(seed=42, n_startup_trials=5)
 
 
-def objective_trigger_classifier(trial):
+def create_study(
+    direction="maximize", study_name: str = None, storage: str = None, model: str = "trigger"
+) -> optuna.Study:
+    """Create (or resume) an Optuna study with a seeded sampler."""
+    sampler = create_sampler(model)
+    pruner = optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=20)
+    
+    if storage and storage.startswith("sqlite"):
+        # Parallel trials share one SQLite file; wait on locks instead of failing
+        storage = optuna.storages.RDBStorage(
+            storage, engine_kwargs={"connect_args": {"timeout": 30}}
+        )
+    
+    return optuna.create_study(
+        study_name=study_name,
+        storage=storage,
+        load_if_exists=True,
+        direction=direction,
+        sampler=sampler,
+        pruner=pruner
+    )
+
+
+def completed_trials(study: optuna.Study) -> List[Dict]:
+    """Summarize finished trials as plain dicts."""
+    return [
+        {"number": trial.number, "value": trial.value, "params": trial.params}
+        for trial in study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+    ]
+
+
+def objective_trigger_classifier(trial, data=None, device: str = "cpu"):
     """Objective function for trigger classifier optimization."""
     
     # Suggest hyperparameters
@@ -121,103 +239,88 @@ def objective_trigger_classifier(trial):
     n_estimators = trial.suggest_int("n_estimators", 50, 200)
     
     try:
-        # Load data with specific gap threshold
-        labeled_data, labels = load_labeled_data("trigger_labels_v2.csv")
-        
-        if not labeled_data:
+        if data is None:
             return 0.0
         
-        # Filter by gap threshold (simulate re-labeling with different threshold)
-        filtered_data = []
-        filtered_labels = []
+        dtrain, dvalid, gap_key = data
         
-        for data, label in zip(labeled_data, labels):
-            # Apply gap threshold filter
-            if data["reward_gap_pct"] >= (gap_thr * 100) or label == 0:
-                filtered_data.append(data)
-                filtered_labels.append(label)
+        # Filter training rows by gap threshold (simulate re-labeling with
+        # different threshold); the shared test set stays fixed across trials.
+        # Subsetting reuses the bin mappers already built for dtrain.
+        start = gap_filter_start(gap_key, gap_thr)
         
-        if len(filtered_data) < 100:  # Need minimum samples
+        if len(gap_key) - start < 100:  # Need minimum samples
             return 0.0
         
-        # Extract features
-        features = extract_features(filtered_data)
-        
-        # Train/test split
-        X_train, X_test, y_train, y_test = train_test_split(
-            features, filtered_labels, test_size=0.2, random_state=42
-        )
+        params = booster_params("binary", learning_rate, max_depth, device, metric="auc")
         
-        # Train model
-        from train_trigger import LGBMClassifier
-        model = LGBMClassifier(
-            n_estimators=n_estimators,
-            learning_rate=learning_rate,
-            max_depth=max_depth,
-            random_state=42
+        # Train model, pruning on validation AUC after each boosting round
+        booster = lgb.train(
+            params, dtrain.subset(np.arange(start, len(gap_key))),
+            num_boost_round=n_estimators,
+            valid_sets=[dvalid],
+            callbacks=[LightGBMPruningCallback(trial, "auc")]
         )
-        model.fit(X_train, y_train)
         
         # Evaluate
-        metrics = evaluate_model(model, X_test, y_test)
-        
-        return metrics['auc']
+        return roc_auc_score(dvalid.get_label(), booster.predict(dvalid.get_data()))
         
-    except Exception as e:
+    except TRIAL_ERRORS as e:
         print(f"Trial failed: {e}")
         return 0.0
+    except optuna.TrialPruned:
+        raise
+    except Exception as e:
+        raise optuna.TrialPruned(f"Trial failed unexpectedly: {e!r}") from e
 
 
-def objective_ranker_model(trial):
+def objective_ranker_model(trial, data=None, device: str = "cpu"):
     """Objective function for ranker model optimization."""
     
     # Suggest hyperparameters
     learning_rate = trial.suggest_float("learning_rate", 0.01, 0.3)
-    max_depth = trial.suggest_int("max_depth", 3, 10)
+    max_depth = trial.suggest_int("max_depth", 3, 8)
     n_estimators = trial.suggest_int("n_estimators", 50, 200)
+    min_data_in_leaf = trial.suggest_int("min_data_in_leaf", 10, 40)
     
     try:
-        # Load data
-        cards = load_card_catalog()
-        users = load_user_data()
-        
-        if not cards or not users:
+        if data is None:
             return 0.0
         
-        # Generate training data (smaller sample for tuning)
-        X, y, groups = generate_ranking_training_data(
-            users[:50], cards, num_samples_per_user=8  # Smaller for speed
-        )
-        
-        if not X:
-            return 0.0
+        dtrain, dvalid, groups_test = data
         
-        # Split data
-        X_train, X_test, y_train, y_test, groups_train, groups_test = train_test_split_groups(
-            X, y, groups, test_size=0.2, random_state=42
+        # Leaves are tied to depth so small trees stay cheap; the Dataset
+        # was binned with RANKER_MAX_BIN
+        params = booster_params(
+            "lambdarank", learning_rate, max_depth, device,
+            metric="map", eval_at=[5],
+            num_leaves=2 ** max_depth - 1,
+            min_data_in_leaf=min_data_in_leaf
         )
         
-        # Train model
-        from train_ranker import LGBMRanker
-        model = LGBMRanker(
-            n_estimators=n_estimators,
-            learning_rate=learning_rate,
-            max_depth=max_depth,
-            random_state=42
+        # Train model, pruning on validation MAP@5 after each boosting round
+        booster = lgb.train(
+            params, dtrain,
+            num_boost_round=n_estimators,
+            valid_sets=[dvalid],
+            callbacks=[LightGBMPruningCallback(trial, "map@5")]
         )
-        model.fit(X_train, y_train, group=groups_train)
         
         # Evaluate
-        metrics = evaluate_ranker(model, X_test, y_test, groups_test)
+        metrics = evaluate_ranker(booster, dvalid.get_data(), dvalid.get_label(), groups_test)
         
         return metrics['map@5']
         
-    except Exception as e:
+    except TRIAL_ERRORS as e:
         print(f"Trial failed: {e}")
         return 0.0
+    except optuna.TrialPruned:
+        raise
+    except Exception as e:
+        raise optuna.TrialPruned(f"Trial failed unexpectedly: {e!r}") from e
 
 
-def objective_combined(trial):
+def objective_combined(trial, trigger_data=None, ranker_data=None, device: str = "cpu"):
     """Combined objective function optimizing both models."""
     
     # Suggest shared hyperparameters
@@ -228,76 +331,64 @@ def objective_combined(trial):
     # Get trigger classifier performance
     trigger_auc = 0.0
     try:
-        # Simplified trigger evaluation
-        labeled_data, labels = load_labeled_data("trigger_labels_v2.csv")
-        if labeled_data:
-            # Quick evaluation (smaller sample)
-            sample_size = min(1000, len(labeled_data))
-            sample_data = labeled_data[:sample_size]
-            sample_labels = labels[:sample_size]
-            
-            features = extract_features(sample_data)
-            X_train, X_test, y_train, y_test = train_test_split(
-                features, sample_labels, test_size=0.3, random_state=42
-            )
+        # Simplified trigger evaluation on the shared small sample
+        if trigger_data is not None:
+            dtrain, dvalid, _ = trigger_data
             
-            from train_trigger import LGBMClassifier
-            model = LGBMClassifier(
-                learning_rate=learning_rate,
-                max_depth=max_depth,
-                n_estimators=100,
-                random_state=42
+            # Only the trigger fit reports to the pruner so steps stay unique
+            booster = lgb.train(
+                booster_params("binary", learning_rate, max_depth, device, metric="auc"),
+                dtrain,
+                num_boost_round=100,
+                valid_sets=[dvalid],
+                callbacks=[LightGBMPruningCallback(trial, "auc")]
             )
-            model.fit(X_train, y_train)
-            metrics = evaluate_model(model, X_test, y_test)
-            trigger_auc = metrics['auc']
-    except:
-        pass
+            trigger_auc = roc_auc_score(dvalid.get_label(), booster.predict(dvalid.get_data()))
+    except TRIAL_ERRORS as e:
+        print(f"Trigger evaluation failed: {e}")
+    except optuna.TrialPruned:
+        raise
+    except Exception as e:
+        raise optuna.TrialPruned(f"Trigger evaluation failed unexpectedly: {e!r}") from e
     
     # Get ranker performance
     ranker_map5 = 0.0
     try:
-        cards = load_card_catalog()
-        users = load_user_data()
-        if cards and users:
-            X, y, groups = generate_ranking_training_data(
-                users[:30], cards, num_samples_per_user=6
+        if ranker_data is not None:
+            dtrain, dvalid, groups_test = ranker_data
+            
+            booster = lgb.train(
+                booster_params("lambdarank", learning_rate, max_depth, device),
+                dtrain,
+                num_boost_round=100
             )
-            if X:
-                X_train, X_test, y_train, y_test, groups_train, groups_test = train_test_split_groups(
-                    X, y, groups, test_size=0.3, random_state=42
-                )
-                
-                from train_ranker import LGBMRanker
-                model = LGBMRanker(
-                    learning_rate=learning_rate,
-                    max_depth=max_depth,
-                    n_estimators=100,
-                    random_state=42
-                )
-                model.fit(X_train, y_train, group=groups_train)
-                metrics = evaluate_ranker(model, X_test, y_test, groups_test)
-                ranker_map5 = metrics['map@5']
-    except:
-        pass
+            metrics = evaluate_ranker(booster, dvalid.get_data(), dvalid.get_label(), groups_test)
+            ranker_map5 = metrics['map@5']
+    except TRIAL_ERRORS as e:
+        print(f"Ranker evaluation failed: {e}")
+    except optuna.TrialPruned:
+        raise
+    except Exception as e:
+        raise optuna.TrialPruned(f"Ranker evaluation failed unexpectedly: {e!r}") from e
     
     # Combined score (weighted average)
     combined_score = 0.6 * trigger_auc + 0.4 * ranker_map5
     return combined_score
 
 
-def save_study_results(study: OptunaStudy, study_name: str):
+def save_study_results(study: optuna.Study, study_name: str):
     """Save Optuna study results."""
     
     MODELS_DIR.mkdir(exist_ok=True)
     
+    trials = completed_trials(study)
     study_results = {
         "study_name": study_name,
-        "direction": study.direction,
-        "best_value": study.best_value,
-        "best_params": study.best_params,
-        "n_trials": len(study.trials),
-        "trials": study.trials
+        "direction": study.direction.name.lower(),
+        "best_value": study.best_value if trials else None,
+        "best_params": study.best_params if trials else None,
+        "n_trials": len(trials),
+        "trials": trials
     }
     
     results_path = MODELS_DIR / f"optuna_{study_name}.json"
@@ -308,16 +399,18 @@ def save_study_results(study: OptunaStudy, study_name: str):
     return results_path
 
 
-def analyze_study_results(study: OptunaStudy):
+def analyze_study_results(study: optuna.Study):
     """Analyze and print study results."""
     
-    if not study.trials:
+    trials = completed_trials(study)
+    if not trials:
         print("❌ No trials completed!")
         return
     
     print(f"\n📊 OPTUNA STUDY ANALYSIS")
     print(f"{'='*50}")
-    print(f"Total trials: {len(study.trials)}")
+    print(f"Total trials: {len(trials)}")
+    print(f"Pruned trials: {len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.PRUNED,)))}")
     print(f"Best value: {study.best_value:.4f}")
     print(f"Best params: {study.best_params}")
     
@@ -328,7 +421,7 @@ def analyze_study_results(study: OptunaStudy):
             print(f"  {param}: {value}")
     
     # Trial performance distribution
-    trial_values = [trial['value'] for trial in study.trials if trial['value'] is not None]
+    trial_values = [trial['value'] for trial in trials]
     if trial_values:
         print(f"\n📈 PERFORMANCE DISTRIBUTION:")
         print(f"  Mean: {sum(trial_values)/len(trial_values):.4f}")
@@ -336,9 +429,9 @@ def analyze_study_results(study: OptunaStudy):
         print(f"  Max:  {max(trial_values):.4f}")
     
     # Top 5 trials
-    sorted_trials = sorted(study.trials, key=lambda x: x['value'], reverse=True)
+    top_trials = heapq.nlargest(5, trials, key=lambda x: x['value'])
     print(f"\n🏆 TOP 5 TRIALS:")
-    for i, trial in enumerate(sorted_trials[:5]):
+    for i, trial in enumerate(top_trials):
         print(f"  {i+1}. Trial {trial['number']:2d}: {trial['value']:.4f} | {trial['params']}")
 
 
@@ -349,8 +442,15 @@ def main():
                        default="combined", help="Model to tune")
     parser.add_argument("--n-trials", type=int, default=20,
                        help="Number of optimization trials")
+    parser.add_argument("--n-jobs", type=int, default=max(1, (os.cpu_count() or 1) // 2),
+                       help="Number of trials to run in parallel")
+    parser.add_argument("--device", type=str, choices=["cpu", "gpu"], default="cpu",
+                       help="LightGBM training device")
     parser.add_argument("--study-name", type=str, default=None,
                        help="Study name (auto-generated if not provided)")
+    parser.add_argument("--storage", type=str, default=None,
+                       help="Optuna storage URL, e.g. sqlite:///models/optuna.db (in-memory if not provided); "
+                            "runs sharing it with the same --study-name resume and extend that study")
     
     args = parser.parse_args()
     
@@ -361,24 +461,50 @@ def main():
     print("🚀 Starting Optuna hyperparameter optimization...")
     print(f"Model: {args.model}")
     print(f"Trials: {args.n_trials}")
+    print(f"Parallel jobs: {args.n_jobs}")
+    print(f"Device: {args.device}")
     print(f"Study: {args.study_name}")
+    print(f"Storage: {args.storage or 'in-memory'}")
     
     # Create study
-    study = create_study(direction="maximize")
+    MODELS_DIR.mkdir(exist_ok=True)
+    study = create_study(
+        direction="maximize", study_name=args.study_name, storage=args.storage, model=args.model
+    )
+    print(f"Sampler: {type(study.sampler).__name__}")
     
-    # Select objective function
+    # Select objective function; train/test splits are built once up front
     if args.model == "trigger":
-        objective_func = objective_trigger_classifier
+        objective_func = partial(
+            objective_trigger_classifier, data=prepare_trigger_split(device=args.device)
+        )
         print(f"\n🎯 Optimizing trigger classifier (AUC)")
     elif args.model == "ranker":
-        objective_func = objective_ranker_model
+        # Smaller sample for speed
+        objective_func = partial(
+            objective_ranker_model, data=prepare_ranker_split(device=args.device)
+        )
         print(f"\n🎯 Optimizing ranker model (MAP@5)")
     else:  # combined
-        objective_func = objective_combined
+        # Quick evaluation on smaller samples of both datasets
+        objective_func = partial(
+            objective_combined,
+            trigger_data=prepare_trigger_split(test_size=0.3, max_rows=1000, device=args.device),
+            ranker_data=prepare_ranker_split(
+                num_users=30, samples_per_user=6, test_size=0.3, device=args.device
+            )
+        )
         print(f"\n🎯 Optimizing combined models (weighted score)")
     
     # Run optimization
-    study.optimize(objective_func, n_trials=args.n_trials)
+    objective_func = partial(objective_func, device=args.device)
+    
+    print(f"🔍 Starting Optuna optimization with {args.n_trials} trials...")
+    study.optimize(objective_func, n_trials=args.n_trials, n_jobs=args.n_jobs, gc_after_trial=True)
+    
+    if not completed_trials(study):
+        print("❌ No trials completed!")
+        return 1
     
     # Analyze results
     analyze_study_results(study)